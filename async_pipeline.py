@@ -0,0 +1,213 @@
+"""asyncio fetch -> parse -> dedup pipeline for paging through several searches at once.
+
+Each stage runs as its own tasks and hands work to the next through a bounded queue, so at
+most queue_size pages are held in flight however many pages are crawled; with an on_page
+callback, records go straight downstream instead of being collected for the whole run.
+Requests are paced by a per-host token bucket that backs off on 429/5xx, instead of fixed sleeps.
+"""
+import asyncio
+import random
+import time
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from dedup import job_key
+from http_fetcher import DEFAULT_PAGE_SIZE, page_url
+from job_parser import get_card_extractor
+from metrics import metrics
+from rate_limit import AsyncTokenBucket
+
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class SearchState:
+    """Pagination progress of one search."""
+
+    def __init__(self, index, search, pages_in_flight):
+        self.index = index
+        self.search = search
+        self.name = search['name']
+        self.url = search['url']
+        self.window = asyncio.Semaphore(pages_in_flight)
+        self.done = False
+        self.seen_keys = set()
+        self.job_datas = []  # Only collected when no on_page callback takes the pages
+        self.pages = 0
+
+
+class AsyncJobPipeline:
+    """Fetch, parse and deduplicate result pages for many searches concurrently."""
+
+    def __init__(self, user_agents, parser_engine='auto', page_size=DEFAULT_PAGE_SIZE, max_pages=10,
+                 max_connections=4, pages_in_flight=2, requests_per_second=1.0, burst=2, queue_size=8,
+                 parse_workers=2, max_retries=4, timeout_seconds=15, extraction_pool=None):
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("The async fetch mode needs aiohttp: pip install aiohttp")
+        self.user_agents = user_agents
+        self.parser_engine = parser_engine
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.max_connections = max_connections
+        self.pages_in_flight = pages_in_flight
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.queue_size = queue_size
+        self.parse_workers = parse_workers
+        self.max_retries = max_retries
+        self.timeout_seconds = timeout_seconds
+        self.extraction_pool = extraction_pool
+        self.stats = {}
+
+    def bucket_for(self, url):
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = AsyncTokenBucket(self.requests_per_second, self.burst)
+        return self.buckets[host]
+
+    async def fetch(self, session, url):
+        """GET url under the host's token bucket, backing off on 429/5xx; return the HTML or None."""
+        bucket = self.bucket_for(url)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            self.stats['requests'] += 1
+            try:
+                with metrics.timer('http_fetch', mode='async'):
+                    async with session.get(url) as response:
+                        metrics.count('http_responses', mode='async', status=response.status)
+                        if response.status == 200:
+                            body = await response.read()
+                            metrics.count('http_bytes', len(body), mode='async')
+                            return body.decode(response.get_encoding(), errors='replace')
+                        if response.status not in RETRY_STATUSES:
+                            print(f"Got HTTP {response.status} for {url}")
+                            return None
+                        retry_after = response.headers.get('Retry-After', '')
+                        status = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.count('http_responses', mode='async', status='error')
+                retry_after = ''
+                status = type(e).__name__
+
+            if attempt == self.max_retries:
+                print(f"Giving up on {url} after {status}")
+                return None
+            # Throttling applies to the whole host, so every request to it waits, not just this one
+            delay = float(retry_after) if retry_after.isdigit() else min(60, 2 ** attempt) + random.uniform(0, 1)
+            self.stats['retries'] += 1
+            bucket.pause(delay)
+        return None
+
+    async def schedule_pages(self, state, page_queue):
+        """Queue the search's pages in order, keeping at most pages_in_flight of them unfinished."""
+        for page in range(self.max_pages):
+            await state.window.acquire()
+            if state.done:
+                return
+            await page_queue.put((state, page))
+
+    async def fetch_worker(self, session, page_queue, html_queue):
+        while True:
+            item = await page_queue.get()
+            if item is None:
+                return
+            state, page = item
+            html = None
+            if not state.done:
+                html = await self.fetch(session, page_url(state.url, page * self.page_size))
+            await html_queue.put((state, page, html))
+
+    async def parse_worker(self, html_queue, parsed_queue):
+        # Parsing is CPU-bound, so it runs on a thread (which hands it to the extraction pool's worker
+        # processes, when there is one) and the loop keeps fetching
+        if self.extraction_pool is not None:
+            extract = self.extraction_pool.extract
+        else:
+            extract = get_card_extractor(self.parser_engine).extract
+        while True:
+            item = await html_queue.get()
+            if item is None:
+                return
+            state, page, html = item
+            job_datas = await asyncio.to_thread(extract, html) if html else None
+            await parsed_queue.put((state, page, job_datas))
+
+    async def dedup_stage(self, parsed_queue, on_page=None):
+        while True:
+            item = await parsed_queue.get()
+            if item is None:
+                return
+            state, page, job_datas = item
+            fresh = []
+            for job_data in job_datas or []:
+                key = job_key(job_data)
+                if key not in state.seen_keys:
+                    state.seen_keys.add(key)
+                    fresh.append(job_data)
+            if job_datas is not None:
+                state.pages += 1
+                self.stats['pages'] += 1
+                print(f"[{state.name}] Page start={page * self.page_size}: {len(job_datas)} cards, {len(fresh)} new")
+                metrics.count('cards_repeated', len(job_datas) - len(fresh), mode='async')
+            if on_page is None:
+                state.job_datas.extend(fresh)
+            elif fresh:
+                on_page(state.index, fresh)
+
+            # A failed page, or one with nothing new, means we are past the end of this search
+            if not fresh and not state.done:
+                state.done = True
+            state.window.release()
+
+    async def run_async(self, searches, on_page=None):
+        self.buckets = {}
+        self.stats = {'requests': 0, 'retries': 0, 'pages': 0}
+        states = [SearchState(i, search, self.pages_in_flight) for i, search in enumerate(searches)]
+        page_queue = asyncio.Queue(self.queue_size)
+        html_queue = asyncio.Queue(self.queue_size)
+        parsed_queue = asyncio.Queue(self.queue_size)
+
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections)
+        timeout = aiohttp.ClientTimeout(total=self.timeout_seconds)
+        headers = {
+            'User-Agent': random.choice(self.user_agents),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        }
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            fetchers = [asyncio.create_task(self.fetch_worker(session, page_queue, html_queue))
+                        for _ in range(self.max_connections)]
+            parsers = [asyncio.create_task(self.parse_worker(html_queue, parsed_queue))
+                       for _ in range(self.parse_workers)]
+            dedup = asyncio.create_task(self.dedup_stage(parsed_queue, on_page))
+
+            # Shut the stages down in order once every search has scheduled its last page
+            await asyncio.gather(*(self.schedule_pages(state, page_queue) for state in states))
+            for _ in fetchers:
+                await page_queue.put(None)
+            await asyncio.gather(*fetchers)
+            for _ in parsers:
+                await html_queue.put(None)
+            await asyncio.gather(*parsers)
+            await parsed_queue.put(None)
+            await dedup
+
+        return states
+
+    def run(self, searches, on_page=None):
+        """Crawl searches and return each one's unique job data, in search order.
+
+        on_page, if given, is called with (search index, new job data) as each page is deduplicated,
+        and the records are not kept, so every search's list comes back empty.
+        """
+        started = time.time()
+        states = asyncio.run(self.run_async(searches, on_page))
+        self.stats['seconds'] = round(time.time() - started, 3)
+        print(f"Async pipeline: {self.stats['pages']} pages, {self.stats['requests']} requests, "
+              f"{self.stats['retries']} retries in {self.stats['seconds']}s")
+        return [state.job_datas for state in states]
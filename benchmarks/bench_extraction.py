@@ -0,0 +1,64 @@
+"""Benchmark: single-pass CardExtractor and the lxml engine vs the original multi-selector extraction.
+
+Checks that all of them produce the same job data on synthetic result pages, then times them.
+Run from the repository root: python benchmarks/bench_extraction.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from fixtures import make_results_page
+from job_parser import LXML_AVAILABLE, CardExtractor, LxmlCardExtractor, extract_job_data_multiple_selectors, find_job_cards_multiple_selectors
+
+
+def legacy_extract(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return [extract_job_data_multiple_selectors(card) for card in find_job_cards_multiple_selectors(soup)]
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def bench(card_count):
+    html = make_results_page(card_count, seed=card_count)
+    extractor = CardExtractor()
+
+    parse_seconds, soup = best_of(lambda: BeautifulSoup(html, 'html.parser'))
+    legacy_seconds, legacy_jobs = best_of(
+        lambda: [extract_job_data_multiple_selectors(card) for card in find_job_cards_multiple_selectors(soup)])
+    single_pass_seconds, _ = best_of(lambda: extractor.extract_tree(soup))
+
+    # Compare the full pipeline including card dedup. The original also kept a card without a job
+    # link once per card selector it matched; those never have a URL and build_jobs drops them.
+    expected = [job for job in legacy_extract(html) if job.get('url')]
+    if [job for job in extractor.extract(html) if job.get('url')] != expected:
+        raise AssertionError(f"Single-pass extraction differs from the original on {card_count} cards")
+
+    line = (f"{card_count:>6} cards ({len(legacy_jobs)} original records): parse {parse_seconds * 1000:8.1f} ms | "
+            f"original {legacy_seconds * 1000:8.1f} ms | single-pass {single_pass_seconds * 1000:8.1f} ms "
+            f"({legacy_seconds / single_pass_seconds:.1f}x)")
+
+    if LXML_AVAILABLE:
+        # Both engines must agree on every record, including cards without a URL
+        lxml_extractor = LxmlCardExtractor()
+        if lxml_extractor.extract(html) != extractor.extract(html):
+            raise AssertionError(f"lxml and BeautifulSoup engines differ on {card_count} cards")
+        lxml_parse_seconds, root = best_of(lambda: lxml_extractor.parse(html))
+        lxml_seconds, _ = best_of(lambda: lxml_extractor.extract_tree(root))
+        line += f" | lxml parse {lxml_parse_seconds * 1000:6.1f} ms + extract {lxml_seconds * 1000:6.1f} ms"
+    print(line)
+
+
+if __name__ == "__main__":
+    for card_count in (25, 250, 1000):
+        bench(card_count)
@@ -0,0 +1,53 @@
+"""Micro-benchmark: hash-indexed is_new_job lookups vs the original linear scan.
+
+Run from the repository root: python benchmarks/bench_is_new_job.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup import JobIndex
+from fixtures import make_jobs
+
+
+def linear_is_new_job(job, previous_jobs):
+    """The original O(stored) scan over title/company/location."""
+    for prev_job in previous_jobs:
+        if (job['title'] == prev_job['title'] and
+            job['company'] == prev_job['company'] and
+            job['location'] == prev_job['location']):
+            return False
+    return True
+
+
+def bench(stored_count, scraped_count=250):
+    stored = make_jobs(stored_count)
+    # Half of the scraped page is already stored, half is new
+    scraped = random.sample(stored, scraped_count // 2) + make_jobs(scraped_count - scraped_count // 2, start=stored_count)
+
+    started = time.perf_counter()
+    for job in scraped:
+        linear_is_new_job(job, stored)
+    linear_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = JobIndex(stored)
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for job in scraped:
+        job not in index
+    lookup_seconds = time.perf_counter() - started
+
+    print(f"{stored_count:>7} stored, {scraped_count} scraped: "
+          f"linear scan {linear_seconds * 1000:9.1f} ms | "
+          f"index build {build_seconds * 1000:7.1f} ms + lookups {lookup_seconds * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for stored_count in (10_000, 100_000):
+        bench(stored_count)
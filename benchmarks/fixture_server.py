@@ -0,0 +1,174 @@
+"""Local stand-in for LinkedIn's server-rendered search pages, for exercising the http/async fetch modes offline.
+
+Serves /jobs/search/?...&start=N with synthetic result pages of 25 cards; past the last page it
+returns an empty result list, as LinkedIn does. Run it (--aiohttp serves the same pages from an
+aiohttp app) and point a search at it:
+
+    python benchmarks/fixture_server.py --port 8765 --pages 4
+    # data/carwler.json: "searches": [{"url": "http://127.0.0.1:8765/jobs/search/?keywords=data%20engineer",
+    #                                  "fetch_mode": "http"}], "host_min_interval_seconds": 0
+
+serve_smtp() is the matching stand-in for the notifier's SMTP server, built on aiosmtpd.
+"""
+import argparse
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from fixtures import make_results_page
+
+
+PAGE_SIZE = 25
+
+
+class FixturePages:
+    """Result pages for both servers; every throttle_every-th request is answered with a 429."""
+
+    def __init__(self, pages, throttle_every=0):
+        self.pages = pages
+        self.throttle_every = throttle_every
+        self.cache = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def respond(self, path):
+        """Return (status, body) for a request path."""
+        parts = urlparse(path)
+        if not parts.path.startswith('/jobs/search'):
+            return 404, b''
+        with self.lock:
+            self.requests += 1
+            if self.throttle_every and self.requests % self.throttle_every == 0:
+                return 429, b''
+            page = int(parse_qs(parts.query).get('start', ['0'])[0]) // PAGE_SIZE
+            if page not in self.cache:
+                # Distinct seeds give distinct job ids on every page
+                self.cache[page] = make_results_page(PAGE_SIZE if page < self.pages else 0, seed=page + 1).encode()
+            return 200, self.cache[page]
+
+
+def make_handler(pages, throttle_every=0):
+    """Build a http.server request handler serving pages result pages."""
+    fixture_pages = FixturePages(pages, throttle_every)
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real site
+
+        def do_GET(self):
+            status, body = fixture_pages.respond(self.path)
+            if status == 404:
+                self.send_error(404)
+                return
+            if status == 429:
+                self.send_response(429)
+                self.send_header('Retry-After', '0')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+def serve_fixtures(pages=4, port=0, throttle_every=0):
+    """Start the stand-in server on a background thread and return (server, base_url)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(pages, throttle_every))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def serve_fixtures_aiohttp(pages=4, port=0, throttle_every=0):
+    """Start an aiohttp stand-in server on its own event loop thread and return (stop, base_url)."""
+    from aiohttp import web
+
+    fixture_pages = FixturePages(pages, throttle_every)
+
+    async def search(request):
+        status, body = fixture_pages.respond(request.path_qs)
+        if status == 429:
+            return web.Response(status=429, headers={'Retry-After': '0'})
+        return web.Response(body=body, content_type='text/html', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/jobs/search/', search)
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', port)
+    loop.run_until_complete(site.start())
+    bound_port = runner.addresses[0][1]
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return stop, f"http://127.0.0.1:{bound_port}"
+
+
+class FixtureMailbox:
+    """aiosmtpd handler that keeps every message; every tempfail_every-th one is answered with a 451 first."""
+
+    def __init__(self, tempfail_every=0):
+        self.tempfail_every = tempfail_every
+        self.messages = []
+        self.sessions = 0
+        self.attempts = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.attempts += 1
+        if self.tempfail_every and self.attempts % self.tempfail_every == 0:
+            return '451 Try again later'
+        self.messages.append((envelope.rcpt_tos, envelope.content))
+        return '250 OK'
+
+
+def serve_smtp(port=0, tempfail_every=0):
+    """Start an aiosmtpd stand-in SMTP server (no TLS or auth) and return (stop, port, mailbox)."""
+    from aiosmtpd.controller import Controller
+
+    if not port:
+        # The controller checks it is up by connecting to its port, so it needs a real one up front
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+    mailbox = FixtureMailbox(tempfail_every)
+    controller = Controller(mailbox, hostname='127.0.0.1', port=port)
+    controller.start()
+    return controller.stop, port, mailbox
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic LinkedIn result pages")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages', type=int, default=4, help="Number of non-empty result pages")
+    parser.add_argument('--throttle-every', type=int, default=0, help="Answer every Nth request with HTTP 429")
+    parser.add_argument('--aiohttp', action='store_true', help="Serve from an aiohttp app instead of http.server")
+    args = parser.parse_args()
+
+    if args.aiohttp:
+        stop, base_url = serve_fixtures_aiohttp(args.pages, args.port, args.throttle_every)
+    else:
+        server, base_url = serve_fixtures(args.pages, args.port, args.throttle_every)
+        stop = server.shutdown
+    print(f"Serving {args.pages} result pages at {base_url}/jobs/search/?keywords=data%20engineer")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stop()
@@ -0,0 +1,168 @@
+"""Synthetic LinkedIn result pages, job records and USCIS employer tables for offline benchmarks.
+
+Cards follow the markup of the public jobs search page (ul.jobs-search__results-list >
+li > div.base-card) and mix in the awkward cases the crawler has to handle: repeated
+cards, masked text, missing company names and cards without a job link.
+"""
+import html
+import random
+
+
+TITLES = ['Data Engineer', 'Data Engineer I', 'Junior Data Engineer', 'ETL Developer', 'Python Developer',
+          'Analytics Engineer', 'Big Data Engineer', 'Cloud Data Engineer', 'Data Platform Engineer',
+          'Senior Data Engineer', 'Data Engineering Manager']
+COMPANIES = ['Jobright.ai', 'Amazon', 'Google', 'Snowflake', 'Databricks', 'Capital One', 'Infosys',
+             'Tata Consultancy Services', 'Acme Analytics', 'BIMCON Inc.', 'Hirenza', 'Meta']
+LOCATIONS = ['United States', 'Austin, TX', 'New York, NY', 'Missouri, United States', 'Remote',
+             'San Francisco Bay Area', 'Seattle, WA']
+POSTED = ['1 minute ago', '12 minutes ago', '1 hour ago', '3 hours ago', '1 day ago']
+
+
+def slugify(text):
+    return ''.join(ch if ch.isalnum() else '-' for ch in text.lower()).strip('-')
+
+
+def make_card(rng, job_id, position):
+    """Render one job card; most are well formed, a few exercise the skip paths."""
+    title = rng.choice(TITLES)
+    company = rng.choice(COMPANIES)
+    location = rng.choice(LOCATIONS)
+    kind = rng.random()
+
+    if kind < 0.03:
+        title, company = '*' * len(title), '*' * len(company)
+    url = (f"https://www.linkedin.com/jobs/view/{slugify(title)}-at-{slugify(company)}-{job_id}"
+           f"?position={position}&amp;pageNum=0&amp;trackingId=abc%3D%3D")
+    link = (f'<a class="base-card__full-link absolute top-0 right-0 bottom-0 left-0 p-0 z-[2]" '
+            f'data-tracking-control-name="public_jobs_jserp-result_search-card" href="{url}">\n'
+            f'        <span class="sr-only">\n          {html.escape(title)}\n        </span>\n      </a>')
+    if 0.03 <= kind < 0.05:
+        link = ''
+    subtitle = (f'<h4 class="base-search-card__subtitle">\n          '
+                f'<a class="hidden-nested-link" data-tracking-control-name="public_jobs_jserp-result_job-search-card-subtitle" '
+                f'href="https://www.linkedin.com/company/{slugify(company)}?trk=public_jobs_jserp-result_job-search-card-subtitle">\n'
+                f'            {html.escape(company)}\n          </a>\n        </h4>')
+    if 0.05 <= kind < 0.07:
+        subtitle = '<h4 class="base-search-card__subtitle"></h4>'
+    benefits = ('<div class="job-posting-benefits text-sm"><icon class="job-posting-benefits__icon"></icon>'
+                '<span class="job-posting-benefits__text">Actively Hiring</span></div>') if kind > 0.8 else ''
+
+    return f'''
+  <li>
+    <div class="base-card relative w-full hover:no-underline focus:no-underline base-card--link base-search-card base-search-card--link job-search-card"
+         data-entity-urn="urn:li:jobPosting:{job_id}" data-impression-id="jobs-search-result-{position}"
+         data-reference-id="ref{job_id}" data-tracking-id="t{job_id}" data-column="1" data-row="{position + 1}">
+      {link}
+      <div class="search-entity-media">
+        <img class="artdeco-entity-image artdeco-entity-image--square-4" alt="{html.escape(company)}"
+             data-delayed-url="https://media.licdn.com/dms/image/logo-{job_id}">
+      </div>
+      <div class="base-search-card__info">
+        <h3 class="base-search-card__title">
+          {html.escape(title)}
+        </h3>
+        {subtitle}
+        <div class="base-search-card__metadata">
+          <span class="job-search-card__location">
+            {html.escape(location)}
+          </span>
+          {benefits}
+          <time class="job-search-card__listdate--new" datetime="2026-10-17">
+            {rng.choice(POSTED)}
+          </time>
+        </div>
+      </div>
+    </div>
+  </li>'''
+
+
+def make_results_page(card_count, seed=0, duplicate_rate=0.02):
+    """Return a full search results page with card_count cards (plus a few repeats)."""
+    rng = random.Random(seed)
+    cards = []
+    for position in range(card_count):
+        cards.append(make_card(rng, 4200000000 + seed * 1_000_000 + position, position))
+        # LinkedIn occasionally renders the same card twice after infinite scroll
+        if rng.random() < duplicate_rate:
+            cards.append(cards[-1])
+
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Data Engineer jobs in United States</title>
+  <script type="application/ld+json">{{"@context": "http://schema.org"}}</script>
+</head>
+<body class="overflow-hidden">
+<header class="base-main-nav"><nav><a href="/">LinkedIn</a><button>Sign in</button></nav></header>
+<main id="main-content" class="two-pane-serp-page__results">
+<section class="two-pane-serp-page__results-list">
+<ul class="jobs-search__results-list">{''.join(cards)}
+</ul>
+<button class="infinite-scroller__show-more-button" aria-label="See more jobs">See more jobs</button>
+</section>
+</main>
+<footer class="li-footer"><ul><li><a href="/legal/user-agreement">User Agreement</a></li>
+<li><a href="/legal/privacy-policy">Privacy Policy</a></li></ul></footer>
+</body>
+</html>
+'''
+
+
+def make_jobs(count, start=0, scraped_date='2026-10-17 09:00:00'):
+    """Generate job records shaped like the crawler's output, each with a distinct job id."""
+    jobs = []
+    for i in range(start, start + count):
+        jobs.append({
+            'title': f"Data Engineer {i % 500}",
+            'company': f"Company {i}",
+            'location': f"City {i % 300}, United States",
+            'date_posted': '1 hour ago',
+            'url': f"https://www.linkedin.com/jobs/view/data-engineer-at-company-{4200000000 + i}?position=1",
+            'source': 'LinkedIn',
+            'scraped_date': scraped_date,
+            'email_sent': False,
+        })
+    return jobs
+
+
+EMPLOYER_WORDS = ['Data', 'Cloud', 'Systems', 'Global', 'Tech', 'Analytics', 'Solutions', 'Consulting', 'Labs',
+                  'Networks', 'Software', 'Digital', 'Health', 'Financial', 'Energy', 'Bio', 'Logic', 'Micro',
+                  'Quantum', 'Apex', 'Summit', 'Blue', 'River', 'North', 'Pacific', 'Atlantic', 'United', 'First',
+                  'Prime', 'Vertex', 'Nova', 'Pixel', 'Signal', 'Harbor', 'Cedar', 'Granite', 'Silver', 'Bright']
+EMPLOYER_SUFFIXES = ['LLC', 'Inc.', 'INC', 'Corp', 'Corporation', 'L.L.C.', ', LLC', 'Ltd', 'LP', 'Co.', '']
+NAME_SYLLABLES = ['ka', 'ro', 'vin', 'tel', 'mar', 'sa', 'li', 'den', 'qu', 'zo', 'ber', 'na', 'gra', 'phi', 'to',
+                  'len', 'ex', 'cor', 'du', 'mi', 'ran', 'sol', 've', 'tri', 'ax', 'hol', 'pen', 'ni', 'gor', 'wa']
+
+
+def make_employer_names(count, seed=0):
+    """Generate a USCIS-like petitioner column: repeated employers with spelling variations."""
+    rng = random.Random(seed)
+    distinct = max(1, count // 3)
+    bases = [' '.join(rng.sample(EMPLOYER_WORDS, rng.randint(1, 3))) + f" {rng.choice(['', str(i)])}".rstrip()
+             for i in range(distinct)]
+    names = []
+    for _ in range(count):
+        suffix = rng.choice(EMPLOYER_SUFFIXES)
+        name = rng.choice(bases) + (suffix if suffix.startswith(',') else f" {suffix}".rstrip())
+        names.append(name.upper() if rng.random() < 0.3 else name)
+    return names
+
+
+def make_long_tail_employer_names(count, seed=0):
+    """Like make_employer_names, but most words are invented, so n-gram frequencies have the real sheet's long tail."""
+    rng = random.Random(seed)
+
+    def word():
+        if rng.random() < 0.4:
+            return rng.choice(EMPLOYER_WORDS)
+        return ''.join(rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+    distinct = max(1, count // 3)
+    bases = [' '.join(word() for _ in range(rng.randint(1, 3))) for _ in range(distinct)]
+    names = []
+    for _ in range(count):
+        suffix = rng.choice(EMPLOYER_SUFFIXES)
+        name = rng.choice(bases) + (suffix if suffix.startswith(',') else f" {suffix}".rstrip())
+        names.append(name.upper() if rng.random() < 0.3 else name)
+    return names
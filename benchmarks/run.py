@@ -0,0 +1,355 @@
+"""Offline benchmark suite for the crawler and matcher.
+
+Times each stage separately on synthetic data, with no Chrome or network access:
+page parsing, card discovery/dedup, field extraction, http fetching from a local
+stand-in server, is_new_job, persistence, company matching, the recall of
+candidate blocking against brute-force matching and sending alert emails to a
+local SMTP stand-in. Results are emitted
+as JSON so runs on different commits can be compared on the same box:
+
+    python benchmarks/run.py --output before.json
+    git checkout <other commit>
+    python benchmarks/run.py --output after.json --compare before.json
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bs4 import BeautifulSoup
+
+from async_pipeline import AIOHTTP_AVAILABLE, AsyncJobPipeline
+from dedup import JobIndex
+from employer_index import EmployerIndex
+from http_fetcher import HttpJobFetcher
+from fixture_server import serve_fixtures, serve_fixtures_aiohttp, serve_smtp
+from fixtures import COMPANIES, make_employer_names, make_jobs, make_long_tail_employer_names, make_results_page
+from job_parser import (LXML_AVAILABLE, CardExtractor, LxmlCardExtractor, PageExtractionPool,
+                        extract_job_data_multiple_selectors, find_job_cards_multiple_selectors)
+from job_store import DATE_FORMAT, JournalJobStore, JsonJobStore, SqliteJobStore
+from notifier import Notifier
+
+
+DEFAULT_CARD_COUNTS = [25, 250, 2500, 10000]
+DEFAULT_EMPLOYER_COUNTS = [1000, 20000, 200000]
+DEFAULT_STORED_JOB_COUNTS = [1000, 10000, 100000]
+QUICK_CARD_COUNTS = [25, 250]
+QUICK_EMPLOYER_COUNTS = [1000, 20000]
+QUICK_STORED_JOB_COUNTS = [1000, 10000]
+BLOCKING_EMPLOYERS = 200000
+QUICK_BLOCKING_EMPLOYERS = 20000
+# (n_probe, probe_overlap) settings compared against brute force; the first is EmployerIndex's default
+BLOCKING_SETTINGS = [(8, 0.75), (4, 0.75), (8, 0.5), (16, 0.75), (8, 1.0)]
+# Entry fields that are measurements rather than parameters, so --compare ignores them when pairing runs
+MEASURED_FIELDS = ('seconds', 'recall', 'candidates_per_company')
+
+
+def best_of(func, repeat):
+    """Run func repeat times and return (fastest seconds, last result)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+class Suite:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []
+
+    def record(self, benchmark, seconds, **params):
+        entry = {'benchmark': benchmark, **params, 'seconds': round(seconds, 6)}
+        self.results.append(entry)
+        details = ', '.join(f"{key}={value}" for key, value in params.items())
+        print(f"  {benchmark:<28} {details:<45} {seconds * 1000:10.2f} ms", file=sys.stderr)
+
+    def time(self, benchmark, func, **params):
+        seconds, result = best_of(func, self.repeat)
+        self.record(benchmark, seconds, **params)
+        return result
+
+    def bench_pages(self, card_counts):
+        print("Parsing and extraction", file=sys.stderr)
+        engines = [('bs4', CardExtractor())]
+        if LXML_AVAILABLE:
+            engines.append(('lxml', LxmlCardExtractor()))
+
+        for cards in card_counts:
+            html = make_results_page(cards, seed=cards)
+
+            soup = self.time('parse', lambda: BeautifulSoup(html, 'html.parser'), engine='bs4', cards=cards)
+            card_elements = self.time('card_dedup', lambda: find_job_cards_multiple_selectors(soup),
+                                      engine='original', cards=cards)
+            self.time('extract', lambda: [extract_job_data_multiple_selectors(card) for card in card_elements],
+                      engine='original', cards=cards)
+
+            for engine, extractor in engines:
+                root = soup if engine == 'bs4' else self.time('parse', lambda: extractor.parse(html),
+                                                               engine=engine, cards=cards)
+                extractor.prepare(root)
+                found = self.time('card_dedup', lambda: extractor.find_cards(root), engine=engine, cards=cards)
+                self.time('extract', lambda: [extractor.extract_card(card) for card in found],
+                          engine=engine, cards=cards)
+
+    def bench_parallel_extract(self, worker_counts=(0, 2, 4), page_count=40, cards=25):
+        print("Parallel page extraction", file=sys.stderr)
+        pages = [make_results_page(cards, seed=seed) for seed in range(page_count)]
+        for workers in worker_counts:
+            pool = PageExtractionPool(workers=workers, min_page_bytes=0)
+            # Start the worker processes outside the timed runs
+            pool.extract_many(pages[:max(workers, 1)])
+            self.time('extract_pages', lambda: pool.extract_many(pages), workers=workers, pages=page_count, cards=cards)
+            pool.close()
+
+    def bench_is_new_job(self, stored_counts, scraped=250):
+        print("Duplicate detection", file=sys.stderr)
+        for stored_count in stored_counts:
+            stored = make_jobs(stored_count)
+            scraped_jobs = stored[:scraped // 2] + make_jobs(scraped - scraped // 2, start=stored_count)
+            index = self.time('job_index_build', lambda: JobIndex(stored), stored=stored_count)
+            self.time('is_new_job', lambda: [job not in index for job in scraped_jobs],
+                      stored=stored_count, scraped=scraped)
+
+    def bench_persistence(self, stored_counts, new_per_run=25):
+        print("Persistence", file=sys.stderr)
+        prune_before = datetime.strptime('2026-10-17 08:00:00', DATE_FORMAT)
+        for stored_count in stored_counts:
+            stored = make_jobs(stored_count)
+            new_jobs = make_jobs(new_per_run, start=stored_count, scraped_date='2026-10-17 09:10:00')
+            backends = {
+                'json': lambda directory: JsonJobStore(os.path.join(directory, 'database.json')),
+                'sqlite': lambda directory: SqliteJobStore(os.path.join(directory, 'jobs.db')),
+                'journal': lambda directory: JournalJobStore(os.path.join(directory, 'jobs.jsonl'),
+                                                             os.path.join(directory, 'database.json'),
+                                                             compact_bytes=1 << 40),
+            }
+            for backend, open_store in backends.items():
+                directory = tempfile.mkdtemp(prefix='jobcrawler-bench-')
+                try:
+                    # Seed through the JSON snapshot (or upserts) outside the timed region
+                    JsonJobStore(os.path.join(directory, 'database.json'))._write(stored)
+                    store = open_store(directory)
+                    if backend == 'sqlite':
+                        store.save_jobs(stored)
+                    self.time('store_load', store.load_jobs, backend=backend, stored=stored_count)
+                    self.time('store_save_run', lambda: store.save_jobs(new_jobs, prune_before=prune_before),
+                              backend=backend, stored=stored_count, new=new_per_run)
+                    self.time('store_mark_sent', lambda: store.mark_email_sent(new_jobs[:5]),
+                              backend=backend, stored=stored_count)
+                    store.close()
+                finally:
+                    shutil.rmtree(directory, ignore_errors=True)
+
+    def bench_http(self, page_counts=(4, 20)):
+        print("HTTP fetch mode (local stand-in server)", file=sys.stderr)
+        extractor = LxmlCardExtractor() if LXML_AVAILABLE else CardExtractor()
+        for pages in page_counts:
+            server, base_url = serve_fixtures(pages)
+            fetcher = HttpJobFetcher(['benchmark'], max_pages=pages + 1)
+            try:
+                url = f"{base_url}/jobs/search/?keywords=data%20engineer"
+                self.time('http_fetch_extract',
+                          lambda: [extractor.extract(html) for _, html in fetcher.iter_pages(url)], pages=pages)
+            finally:
+                fetcher.close()
+                server.shutdown()
+
+        if not AIOHTTP_AVAILABLE:
+            return
+        for pages in page_counts:
+            stop, base_url = serve_fixtures_aiohttp(pages)
+            # Unthrottled, so this measures pipeline overhead rather than the token bucket
+            pipeline = AsyncJobPipeline(['benchmark'], max_pages=pages + 1, requests_per_second=0)
+            searches = [{'name': name, 'url': f"{base_url}/jobs/search/?keywords={name}"} for name in ('a', 'b')]
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.time('async_pipeline', lambda: pipeline.run(searches), pages=pages, searches=len(searches))
+            finally:
+                stop()
+
+    def bench_matching(self, employer_counts, companies=500, chunk_size=1024):
+        print("Company matching", file=sys.stderr)
+        company_names = [f"{COMPANIES[i % len(COMPANIES)]} {i}" if i % 3 else COMPANIES[i % len(COMPANIES)]
+                         for i in range(companies)]
+        for employer_count in employer_counts:
+            employer_names = make_employer_names(employer_count, seed=employer_count)
+            # Mix in exact employer names so some companies clear the threshold
+            queries = company_names[:companies // 2] + employer_names[:companies - companies // 2]
+            for collapse in (False, True):
+                # Fitting takes seconds on large tables, so it is timed once
+                with contextlib.redirect_stdout(io.StringIO()):
+                    seconds, index = best_of(lambda: EmployerIndex(employer_names, collapse=collapse), 1)
+                self.record('employer_index_fit', seconds, employers=employer_count, collapse=collapse)
+                print(f"  {'':<28} {len(index)} rows scored", file=sys.stderr)
+                self.time('match_batch', lambda: index.match_batch(queries, chunk_size=chunk_size),
+                          employers=employer_count, companies=companies, collapse=collapse)
+
+    def bench_blocking(self, employer_count, companies=500):
+        """Compare candidate blocking settings with brute-force scoring: speed, and recall of matches at the threshold."""
+        print("Candidate blocking", file=sys.stderr)
+        employer_names = make_long_tail_employer_names(employer_count, seed=employer_count)
+        # Uncollapsed, so every petition row is scored and the table size is employer_count
+        index = EmployerIndex(employer_names, n_probe=None, collapse=False)
+        # Unrelated companies, exact petitioner names, case/suffix variants and names with a dropped letter
+        quarter = companies // 4
+        queries = ([f"{COMPANIES[i % len(COMPANIES)]} {i}" for i in range(companies - 3 * quarter)]
+                   + employer_names[:quarter]
+                   + [name.lower().replace(',', '') + ' inc' for name in employer_names[quarter:2 * quarter]]
+                   + [name[:3] + name[4:] for name in employer_names[2 * quarter:3 * quarter]])
+
+        exact = self.time('match_blocking', lambda: index.match_batch(queries), employers=employer_count,
+                          companies=companies, n_probe=None, probe_overlap=None)
+        expected = [i for i, match in enumerate(exact) if match is not None]
+        for n_probe, probe_overlap in BLOCKING_SETTINGS:
+            index.n_probe, index.probe_overlap = n_probe, probe_overlap
+            matches = self.time('match_blocking', lambda: index.match_batch(queries), employers=employer_count,
+                                companies=companies, n_probe=n_probe, probe_overlap=probe_overlap)
+            # A match is recalled when blocking finds an employer with the brute-force best score
+            found = sum(matches[i] is not None and abs(matches[i][1] - exact[i][1]) < 1e-9 for i in expected)
+            recall = found / len(expected) if expected else 1.0
+            candidates = index.last_batch_stats['candidates_per_company']
+            self.results[-1].update(recall=round(recall, 4),
+                                    candidates_per_company=None if candidates is None else round(candidates, 1))
+            # Tables under BLOCKING_MIN_EMPLOYERS are always scored in full
+            scored = 'blocking off' if candidates is None else f"{candidates:.0f} candidates/company"
+            print(f"  {'':<28} recall@{index.threshold}={recall:.4f}, {scored} of {len(index)} employers",
+                  file=sys.stderr)
+
+    def bench_notify(self, recipients=40, jobs_per_digest=25):
+        """Time sending a batch of digests: a connection per message (the old behaviour) vs the pooled notifier."""
+        if importlib.util.find_spec('aiosmtpd') is None:
+            return
+        print("Email notifications", file=sys.stderr)
+        jobs = [{'company': company, 'matched_company': f"{company} LLC", 'title': 'Data Engineer', 'match_score': 0.9,
+                 'petitions': 12, 'url': f"https://www.linkedin.com/jobs/view/{4200000000 + i}"}
+                for i, company in enumerate(COMPANIES * (jobs_per_digest // len(COMPANIES) + 1))][:jobs_per_digest]
+        digests = [(f"contact{i}@example.com", jobs) for i in range(recipients)]
+        stop, port, mailbox = serve_smtp()
+
+        def notifier(concurrency):
+            return Notifier('benchmark@example.com', host='127.0.0.1', port=port, starttls=False,
+                            concurrency=concurrency, max_retries=0)
+
+        def send_unpooled():
+            for digest in digests:
+                single = notifier(1)
+                single.send_digests([digest])
+                single.close()
+
+        def send_pooled(concurrency):
+            pooled = notifier(concurrency)
+            pooled.send_digests(digests)
+            pooled.close()
+
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.time('notify', send_unpooled, recipients=recipients, pooled=False, concurrency=1)
+                for concurrency in (1, 4):
+                    self.time('notify', lambda: send_pooled(concurrency), recipients=recipients, pooled=True,
+                              concurrency=concurrency)
+        finally:
+            stop()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def result_key(entry):
+    return tuple(sorted((key, value) for key, value in entry.items() if key not in MEASURED_FIELDS))
+
+
+def compare(results, baseline_path):
+    """Print the ratio of each timing against a previous JSON report."""
+    with open(baseline_path, 'r') as f:
+        baseline = {result_key(entry): entry['seconds'] for entry in json.load(f)['results']}
+    print(f"\nComparison against {baseline_path} (ratio > 1 is slower):", file=sys.stderr)
+    for entry in results:
+        previous = baseline.get(result_key(entry))
+        if previous:
+            ratio = entry['seconds'] / previous
+            flag = '  REGRESSION' if ratio > 1.2 else ''
+            details = ', '.join(f"{key}={value}" for key, value in entry.items() if key not in MEASURED_FIELDS)
+            print(f"  {details:<75} {ratio:6.2f}x{flag}", file=sys.stderr)
+
+
+def parse_counts(value):
+    return [int(count) for count in value.split(',') if count]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=parse_counts, help="Card counts per result page (default 25,250,2500,10000)")
+    parser.add_argument('--employers', type=parse_counts, help="USCIS table sizes (default 1000,20000,200000)")
+    parser.add_argument('--blocking-employers', type=int,
+                        help=f"USCIS table size for the blocking recall benchmark (default {BLOCKING_EMPLOYERS})")
+    parser.add_argument('--stored-jobs', type=parse_counts, help="Stored job counts (default 1000,10000,100000)")
+    parser.add_argument('--only', choices=['pages', 'http', 'is_new_job', 'persistence', 'matching', 'notify'],
+                        action='append',
+                        help="Run only these benchmark groups")
+    parser.add_argument('--repeat', type=int, default=3, help="Take the best of this many runs")
+    parser.add_argument('--quick', action='store_true', help="Use small sizes for a fast smoke run")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    card_counts = args.cards or (QUICK_CARD_COUNTS if args.quick else DEFAULT_CARD_COUNTS)
+    employer_counts = args.employers or (QUICK_EMPLOYER_COUNTS if args.quick else DEFAULT_EMPLOYER_COUNTS)
+    stored_counts = args.stored_jobs or (QUICK_STORED_JOB_COUNTS if args.quick else DEFAULT_STORED_JOB_COUNTS)
+    groups = args.only or ['pages', 'http', 'is_new_job', 'persistence', 'matching', 'notify']
+
+    suite = Suite(args.repeat)
+    if 'pages' in groups:
+        suite.bench_pages(card_counts)
+        suite.bench_parallel_extract()
+    if 'http' in groups:
+        suite.bench_http()
+    if 'is_new_job' in groups:
+        suite.bench_is_new_job(stored_counts)
+    if 'persistence' in groups:
+        suite.bench_persistence(stored_counts)
+    if 'matching' in groups:
+        suite.bench_matching(employer_counts)
+        suite.bench_blocking(args.blocking_employers or (QUICK_BLOCKING_EMPLOYERS if args.quick else BLOCKING_EMPLOYERS))
+    if 'notify' in groups:
+        suite.bench_notify()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().strftime(DATE_FORMAT),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'lxml': LXML_AVAILABLE,
+            'repeat': args.repeat,
+        },
+        'results': suite.results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(suite.results)} results to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        compare(suite.results, args.compare)
@@ -0,0 +1,144 @@
+"""Long-running crawl+match loop.
+
+Keeps the crawler (with its warm browsers), the job store and the fitted employer index in
+memory, and runs a crawl followed by a match every interval_seconds:
+
+    python daemon.py                 # run until SIGINT/SIGTERM
+    python daemon.py --interval 300
+    python daemon.py --once          # a single cycle, like pipeline.py
+"""
+import argparse
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from pipeline import CrawlMatchPipeline
+
+
+DEFAULT_INTERVAL_SECONDS = 600
+
+
+class CycleLock:
+    """Non-blocking lock file so two processes never crawl into the same store at once."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def acquire(self):
+        self.file = open(self.path, 'a+')
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self.file.close()
+            self.file = None
+            return False
+
+    def release(self):
+        if self.file is not None:
+            if fcntl is not None:
+                fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+
+
+class CrawlMatchDaemon:
+    def __init__(self, interval_seconds=None, config_file=None):
+        """Load the crawler, job store and employer index once for every cycle."""
+        self.pipeline = CrawlMatchPipeline(config_file=config_file)
+        self.crawler = self.pipeline.crawler
+        if interval_seconds is None:
+            interval_seconds = self.crawler.config.get('daemon_interval_seconds', DEFAULT_INTERVAL_SECONDS)
+        self.interval = interval_seconds
+        self.stop_event = threading.Event()
+        self.cycle_lock = threading.Lock()
+        self.file_lock = CycleLock(os.path.join(os.path.dirname(self.crawler.store.path), 'crawler.lock'))
+        self.cycles = 0
+        self.skipped = 0
+
+    def run_cycle(self):
+        """Crawl, match and notify once. Returns False if another cycle was still running."""
+        # Overlap protection: within this process and against other processes sharing the data directory
+        if not self.cycle_lock.acquire(blocking=False):
+            print("Previous cycle still running, skipping")
+            return False
+        try:
+            if not self.file_lock.acquire():
+                print(f"Another crawler holds {self.file_lock.path}, skipping this cycle")
+                return False
+            try:
+                started = time.time()
+                print(f"\n=== Cycle {self.cycles + 1} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
+                new_jobs = self.pipeline.run_cycle()
+                self.cycles += 1
+                print(f"=== Cycle finished in {time.time() - started:.1f}s with {len(new_jobs)} new jobs ===")
+                return True
+            finally:
+                self.file_lock.release()
+        finally:
+            self.cycle_lock.release()
+
+    def run_forever(self):
+        """Run cycles on a fixed schedule until stop() is called."""
+        # Cycles start at fixed multiples of the interval from the first one, so they don't drift
+        # by however long each cycle took; cycles that would start late are skipped, not queued
+        next_run = time.monotonic()
+        while not self.stop_event.is_set():
+            try:
+                self.run_cycle()
+            except Exception as e:
+                print(f"Error in crawl+match cycle: {e}")
+            if self.stop_event.is_set():
+                break
+
+            next_run += self.interval
+            now = time.monotonic()
+            if next_run < now:
+                missed = int((now - next_run) // self.interval) + 1
+                self.skipped += missed
+                next_run += missed * self.interval
+                print(f"Cycle overran the {self.interval}s interval, skipping {missed} scheduled run(s)")
+            print(f"Next cycle in {next_run - now:.0f}s")
+            self.stop_event.wait(next_run - now)
+
+    def stop(self, signum=None, frame=None):
+        """Finish the current cycle, then exit; a second signal exits immediately."""
+        if self.stop_event.is_set():
+            raise KeyboardInterrupt
+        print("\nShutting down after the current cycle...")
+        self.stop_event.set()
+
+    def close(self):
+        self.pipeline.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl LinkedIn and match H-1B sponsors on a schedule")
+    parser.add_argument('--interval', type=float, help="Seconds between cycle starts (default from carwler.json)")
+    parser.add_argument('--once', action='store_true', help="Run a single cycle and exit")
+    args = parser.parse_args()
+
+    daemon = CrawlMatchDaemon(args.interval)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    try:
+        if args.once:
+            daemon.run_cycle()
+        else:
+            print(f"Starting crawl+match daemon, one cycle every {daemon.interval}s")
+            daemon.run_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        daemon.close()
+        print(f"Ran {daemon.cycles} cycle(s), skipped {daemon.skipped}")
@@ -0,0 +1,218 @@
+import hashlib
+import math
+import os
+import re
+import struct
+from array import array
+from datetime import datetime, timedelta
+
+
+# LinkedIn job URLs end in the numeric posting id, e.g. /jobs/view/data-engineer-at-acme-4265815418?position=4
+JOB_ID_PATTERN = re.compile(r'/jobs/view/(?:[^/?#]*?-)?(\d+)(?:[/?#]|$)')
+
+
+def parse_job_id(url):
+    """Return the numeric LinkedIn job id from a job URL, or None."""
+    if not url:
+        return None
+    match = JOB_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def job_key(job):
+    """Return a stable dedup key: the LinkedIn job id, or a hash of title/company/location."""
+    job_id = parse_job_id(job.get('url'))
+    if job_id:
+        return f"li:{job_id}"
+    fields = '\x1f'.join(str(job.get(field, '')) for field in ('title', 'company', 'location'))
+    return f"h:{hashlib.blake2b(fields.encode(), digest_size=8).hexdigest()}"
+
+
+class JobIndex:
+    def __init__(self, jobs=()):
+        """Build a constant-time lookup of already stored jobs."""
+        self.keys = set()
+        for job in jobs:
+            self.add(job)
+
+    def add(self, job):
+        self.keys.add(job_key(job))
+
+    def __contains__(self, job):
+        return job_key(job) in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+
+SEEN_DATE_FORMAT = '%Y-%m-%d'
+
+
+def key_digest(key):
+    """64-bit digest of a dedup key; this is all a seen-job partition keeps per job."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+
+
+class DigestSet:
+    """Exact seen-job partition: the set of key digests, appended to disk as packed 8-byte integers."""
+
+    suffix = '.keys'
+
+    def __init__(self, path):
+        self.path = path
+        self.digests = set()
+        self.pending = array('Q')
+        if os.path.exists(path):
+            stored = array('Q')
+            with open(path, 'rb') as f:
+                stored.frombytes(f.read())
+            self.digests.update(stored)
+
+    def __contains__(self, digest):
+        return digest in self.digests
+
+    def add(self, digest):
+        if digest not in self.digests:
+            self.digests.add(digest)
+            self.pending.append(digest)
+
+    def __len__(self):
+        return len(self.digests)
+
+    def save(self):
+        if self.pending:
+            with open(self.path, 'ab') as f:
+                self.pending.tofile(f)
+            self.pending = array('Q')
+
+
+class BloomFilter:
+    """Fixed-size seen-job partition: a Bloom filter sized for expected_items at false_positive_rate."""
+
+    suffix = '.bloom'
+    HEADER = struct.Struct('<QII')  # bits, hash count, items added
+
+    def __init__(self, path, expected_items=5000, false_positive_rate=0.001):
+        self.path = path
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.bits, self.hashes, self.items = self.HEADER.unpack_from(data)
+            self.array = bytearray(data[self.HEADER.size:])
+            return
+        # Standard sizing: m = -n ln p / (ln 2)^2 bits and k = (m / n) ln 2 hash functions
+        expected_items = max(1, expected_items)
+        self.bits = max(64, math.ceil(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / expected_items * math.log(2)))
+        self.items = 0
+        self.array = bytearray((self.bits + 7) // 8)
+
+    def positions(self, digest):
+        # Double hashing: the two 32-bit halves of the digest generate all k bit positions
+        h1 = digest & 0xFFFFFFFF
+        h2 = (digest >> 32) | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def __contains__(self, digest):
+        return all(self.array[position >> 3] & (1 << (position & 7)) for position in self.positions(digest))
+
+    def add(self, digest):
+        if digest in self:
+            return
+        for position in self.positions(digest):
+            self.array[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+        self.dirty = True
+
+    def __len__(self):
+        return self.items
+
+    def save(self):
+        if self.dirty:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(self.HEADER.pack(self.bits, self.hashes, self.items))
+                f.write(self.array)
+            os.replace(temp_path, self.path)
+            self.dirty = False
+
+
+class SeenJobStore:
+    """Jobs seen in the last horizon_days, kept as one compact partition file per day.
+
+    A job counts as seen from the last day it was listed, so a posting that stays up is never
+    reported again. Partitions older than the horizon are dropped by deleting their file. Exact
+    partitions cost 8 bytes per job on disk and a set entry in memory; with bloom=True each day
+    is a fixed-size Bloom filter, so memory stays bounded however many jobs are seen, at the cost
+    of false_positive_rate of new jobs being taken for seen ones.
+    """
+
+    def __init__(self, directory, horizon_days=30, bloom=False, expected_jobs_per_day=5000,
+                 false_positive_rate=0.001):
+        self.directory = directory
+        self.horizon_days = horizon_days
+        self.bloom = bloom
+        self.expected_jobs_per_day = expected_jobs_per_day
+        self.false_positive_rate = false_positive_rate
+        self.partitions = {}  # date -> DigestSet or BloomFilter, newest first
+        os.makedirs(directory, exist_ok=True)
+        self.expire()
+
+        # Partitions keep their format when the bloom setting changes; only new days use the new one
+        loaded = {}
+        for name in os.listdir(directory):
+            day, suffix = os.path.splitext(name)
+            if suffix not in (DigestSet.suffix, BloomFilter.suffix):
+                continue
+            try:
+                date = datetime.strptime(day, SEEN_DATE_FORMAT).date()
+            except ValueError:
+                continue
+            path = os.path.join(directory, name)
+            loaded[date] = DigestSet(path) if suffix == DigestSet.suffix else BloomFilter(path)
+        self.partitions = dict(sorted(loaded.items(), reverse=True))
+
+    def partition_for(self, date):
+        if date not in self.partitions:
+            name = date.strftime(SEEN_DATE_FORMAT)
+            if self.bloom:
+                partition = BloomFilter(os.path.join(self.directory, name + BloomFilter.suffix),
+                                        self.expected_jobs_per_day, self.false_positive_rate)
+            else:
+                partition = DigestSet(os.path.join(self.directory, name + DigestSet.suffix))
+            self.partitions = {date: partition, **self.partitions}
+        return self.partitions[date]
+
+    def __contains__(self, job):
+        digest = key_digest(job_key(job))
+        return any(digest in partition for partition in self.partitions.values())
+
+    def add(self, job, date=None):
+        """Record job as seen on date (today by default)."""
+        self.partition_for(date or datetime.now().date()).add(key_digest(job_key(job)))
+
+    def __len__(self):
+        """Seen entries across partitions; a job listed on several days counts once per day."""
+        return sum(len(partition) for partition in self.partitions.values())
+
+    def expire(self, today=None):
+        """Delete partitions that fall outside the horizon; returns how many were dropped."""
+        cutoff = (today or datetime.now().date()) - timedelta(days=self.horizon_days)
+        dropped = 0
+        for name in os.listdir(self.directory):
+            day = name.split('.', 1)[0]
+            try:
+                date = datetime.strptime(day, SEEN_DATE_FORMAT).date()
+            except ValueError:
+                continue
+            if date < cutoff:
+                os.remove(os.path.join(self.directory, name))
+                self.partitions.pop(date, None)
+                dropped += 1
+        return dropped
+
+    def save(self):
+        for partition in self.partitions.values():
+            partition.save()
+        self.expire()
@@ -0,0 +1,223 @@
+"""chromedriver resolution with an on-disk cache, and a pool of reusable browsers."""
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+from metrics import metrics
+
+
+CHROME_BINARIES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+VERSION_PATTERN = re.compile(r'(\d+)\.\d+\.\d+(?:\.\d+)?')
+
+
+def major_version(command):
+    """Run `command --version` and return the major version number, or None."""
+    try:
+        output = subprocess.run([command, '--version'], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output)
+    return int(match.group(1)) if match else None
+
+
+def chrome_major_version():
+    for binary in CHROME_BINARIES:
+        if shutil.which(binary):
+            version = major_version(binary)
+            if version:
+                return version
+    return None
+
+
+def resolve_driver_path(cache_file):
+    """Return (chromedriver path, whether it came from the cache).
+
+    ChromeDriverManager is only consulted when the cached driver is missing or its major
+    version no longer matches the installed Chrome.
+    """
+    chrome_version = chrome_major_version()
+    try:
+        with open(cache_file, 'r') as f:
+            cached = json.load(f)
+        # Without a readable Chrome version there is nothing to compare, so trust the cached driver
+        if os.path.exists(cached['path']) and (chrome_version is None or (
+                cached.get('chrome_version') == chrome_version and major_version(cached['path']) == chrome_version)):
+            return cached['path'], True
+    except (OSError, ValueError, KeyError):
+        pass
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+    with open(cache_file, 'w') as f:
+        json.dump({'path': path, 'chrome_version': chrome_version,
+                   'driver_version': major_version(path)}, f, indent=4)
+    return path, False
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of a process and all its descendants in MB, or None where it can't be read."""
+    if PSUTIL_AVAILABLE:
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except psutil.Error:
+            return None
+    if not os.path.isdir('/proc'):
+        return None
+
+    # Without psutil, walk /proc: map parents to children, then sum VmRSS over the tree
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat', 'r') as f:
+                    # The command name may contain spaces; the parent pid follows the closing parenthesis
+                    parent = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(parent, []).append(int(entry))
+
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def browser_memory_mb(driver):
+    """Memory used by a WebDriver's chromedriver and browser processes, or None."""
+    try:
+        return process_tree_rss_mb(driver.service.process.pid)
+    except AttributeError:
+        return None
+
+
+def driver_is_alive(driver):
+    """Check whether the browser still answers, e.g. after a page failed to load."""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+class DriverPool:
+    """A bounded pool of WebDriver instances shared by the search threads.
+
+    Browsers stay warm between pages and runs; one is recycled after recycle_after_pages pages
+    or once its memory has grown by recycle_memory_growth_mb since it started.
+    """
+
+    def __init__(self, create_driver, size, recycle_after_pages=50, recycle_memory_growth_mb=None):
+        self.create_driver = create_driver
+        self.size = size
+        self.recycle_after_pages = recycle_after_pages
+        self.recycle_memory_growth_mb = recycle_memory_growth_mb
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.drivers = {}  # driver -> {'pages', 'baseline_mb', 'slot'}
+        self.free_slots = list(range(size))
+        self.startup_seconds = []
+        self.recycled = 0
+
+    def acquire(self):
+        """Take an idle driver, starting a new one if fewer than size are running."""
+        self.slots.acquire()
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            slot = self.free_slots.pop()
+        started = time.time()
+        try:
+            # The slot number lets create_driver give each concurrent browser its own profile directory
+            driver = self.create_driver(slot)
+        except Exception:
+            with self.lock:
+                self.free_slots.append(slot)
+            self.slots.release()
+            raise
+        startup = time.time() - started
+        metrics.observe('driver_startup', startup)
+        with self.lock:
+            self.startup_seconds.append(startup)
+            self.drivers[driver] = {'pages': 0, 'baseline_mb': browser_memory_mb(driver), 'slot': slot}
+        return driver
+
+    def needs_recycling(self, driver):
+        info = self.drivers[driver]
+        if self.recycle_after_pages and info['pages'] >= self.recycle_after_pages:
+            return f"after {info['pages']} pages"
+        if self.recycle_memory_growth_mb and info['baseline_mb'] is not None:
+            grown = (browser_memory_mb(driver) or info['baseline_mb']) - info['baseline_mb']
+            if grown >= self.recycle_memory_growth_mb:
+                return f"after growing {grown:.0f} MB"
+        return None
+
+    def release(self, driver, pages=1):
+        """Return a healthy driver to the pool after it loaded pages, recycling it if it is worn out."""
+        with self.lock:
+            self.drivers[driver]['pages'] += pages
+        reason = self.needs_recycling(driver)
+        if reason:
+            print(f"Recycling browser {reason}")
+            self.recycled += 1
+            metrics.count('browsers_recycled')
+            self.discard(driver)
+            return
+        self.idle.put(driver)
+        self.slots.release()
+
+    def discard(self, driver):
+        """Quit a broken or worn-out driver and free its slot for a fresh one."""
+        with self.lock:
+            info = self.drivers.pop(driver, None)
+            if info is not None:
+                self.free_slots.append(info['slot'])
+        try:
+            driver.quit()
+        except:
+            pass
+        self.slots.release()
+
+    def close(self):
+        """Quit every driver the pool started."""
+        with self.lock:
+            drivers = list(self.drivers)
+            self.free_slots.extend(info['slot'] for info in self.drivers.values())
+            self.drivers.clear()
+        while True:
+            try:
+                self.idle.get_nowait()
+            except queue.Empty:
+                break
+        for driver in drivers:
+            try:
+                driver.quit()
+            except:
+                pass
+        return len(drivers)
@@ -0,0 +1,375 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+
+EMPLOYER_COLUMN = 'Employer (Petitioner) Name'
+
+# Bump when the cached array layout or name cleaning changes so stale caches are rebuilt
+CACHE_FORMAT_VERSION = 2
+
+# Trailing words dropped from employer and company names before matching
+LEGAL_SUFFIXES = frozenset(['llc', 'pllc', 'llp', 'lp', 'inc', 'incorporated', 'corp', 'corporation', 'co', 'company',
+                            'ltd', 'limited', 'plc', 'pc', 'pa', 'na'])
+
+# Candidate blocking: only employers sharing DEFAULT_PROBE_OVERLAP of a company's DEFAULT_N_PROBE rarest
+# n-grams are scored. Raise the overlap for speed or lower it for recall; n_probe=None scores every employer.
+DEFAULT_N_PROBE = 8
+DEFAULT_PROBE_OVERLAP = 0.75
+# Below this many employers scoring every one with a single sparse product is faster than blocking
+BLOCKING_MIN_EMPLOYERS = 20000
+
+
+_DOTTED_ABBREVIATION = re.compile(r'\b(?:\w\.){2,}')
+_PUNCTUATION = re.compile(r'[\W_]+')
+
+
+def normalize_employer(name):
+    """Normalize a petitioner or company name: case, punctuation and trailing legal suffixes.
+
+    "AMAZON.COM SERVICES, L.L.C." and "Amazon.com Services LLC" both become "amazon com services".
+    A name that is nothing but a suffix ("LLC") is kept as it is.
+    """
+    text = _DOTTED_ABBREVIATION.sub(lambda match: match.group().replace('.', ''), str(name).lower())
+    words = _PUNCTUATION.sub(' ', text).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def collapse_employers(petitioner_names):
+    """Collapse one-row-per-petition names into one row per normalized employer.
+
+    Returns (names, petition_counts, variants): each employer is named after its most common
+    spelling and keeps every spelling seen, most common first, to map matches back to the sheet.
+    """
+    spellings_by_key = {}
+    for name in petitioner_names:
+        name = str(name).strip()
+        spellings_by_key.setdefault(normalize_employer(name), Counter())[name] += 1
+
+    names, petition_counts, variants = [], [], []
+    for spellings in spellings_by_key.values():
+        # most_common keeps first-seen order among equally common spellings
+        ordered = [spelling for spelling, _ in spellings.most_common()]
+        names.append(ordered[0])
+        petition_counts.append(sum(spellings.values()))
+        variants.append(ordered)
+    return names, np.array(petition_counts, dtype=np.int64), variants
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """Hash a file's content without loading it all into memory."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class EmployerIndex:
+    def __init__(self, employer_names, threshold=0.6, analyzer='char_wb', ngram_range=(2, 3), n_probe=DEFAULT_N_PROBE,
+                 probe_overlap=DEFAULT_PROBE_OVERLAP, collapse=True):
+        """Fit the TF-IDF vectorizer and employer matrix once for reuse across jobs.
+
+        With collapse, petition rows are first merged per normalized employer name, and both
+        employers and companies are normalized before vectorizing.
+        """
+        self.collapse = collapse
+        if collapse:
+            petition_rows = len(employer_names)
+            employer_names, petition_counts, variants = collapse_employers(employer_names)
+            print(f"Collapsed {petition_rows} petition rows into {len(employer_names)} employers "
+                  f"({1 - len(employer_names) / max(petition_rows, 1):.0%} fewer rows to score)")
+        else:
+            petition_counts = np.ones(len(employer_names), dtype=np.int64)
+            variants = [[str(name)] for name in employer_names]
+        self.employer_names = np.asarray(employer_names, dtype=object)
+        self.petition_counts = petition_counts
+        self.variant_names = np.asarray([name for names in variants for name in names], dtype=object)
+        self.variant_indptr = np.cumsum([0] + [len(names) for names in variants])
+        self.rows_by_name = None
+        self.threshold = threshold
+        self.n_probe = n_probe
+        self.probe_overlap = probe_overlap
+        self.postings = None
+        self.analyzer = analyzer
+        self.ngram_range = tuple(ngram_range)
+
+        # Keep raw TF-IDF weights so query rows can be normalized with their unseen n-grams too
+        self.vectorizer = TfidfVectorizer(analyzer=self.analyzer, ngram_range=self.ngram_range, norm=None,
+                                          preprocessor=self.preprocessor())
+        self.employer_matrix = normalize(self.vectorizer.fit_transform(self.employer_names)).tocsr()
+        self.version = self._names_digest()
+        self.last_batch_stats = None
+
+    def _names_digest(self):
+        """Identify an index built directly from names by its employers and vectorizer parameters."""
+        digest = hashlib.sha256(json.dumps(self.params()).encode())
+        for name in self.employer_names:
+            digest.update(str(name).encode())
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def params(self):
+        """Return the vectorizer parameters that determine the fitted matrix."""
+        return {'analyzer': self.analyzer, 'ngram_range': list(self.ngram_range), 'collapse': self.collapse}
+
+    def preprocessor(self):
+        """Return the name cleaning the vectorizer applies to employers and companies alike."""
+        return normalize_employer if self.collapse else None
+
+    @classmethod
+    def from_excel(cls, excel_file_path, **kwargs):
+        """Build an index from the USCIS petitioner sheet."""
+        excel_data = pd.read_excel(excel_file_path)
+        excel_data.dropna(subset=[EMPLOYER_COLUMN], inplace=True)  # Drop rows with missing company names
+        return cls(excel_data[EMPLOYER_COLUMN].astype(str).tolist(), **kwargs)
+
+    @classmethod
+    def load_cached(cls, excel_file_path, cache_dir, threshold=0.6, analyzer='char_wb', ngram_range=(2, 3),
+                    n_probe=DEFAULT_N_PROBE, probe_overlap=DEFAULT_PROBE_OVERLAP, collapse=True):
+        """Load the fitted index from cache_dir, rebuilding it when the sheet or parameters change.
+
+        The cache is keyed by the xlsx content hash and vectorizer parameters, so a warm
+        run only hashes the sheet and never goes through openpyxl.
+        """
+        params = {'analyzer': analyzer, 'ngram_range': list(ngram_range), 'collapse': collapse}
+        cache_key = hashlib.sha256(json.dumps({
+            'xlsx_sha256': file_sha256(excel_file_path),
+            'params': params,
+            'format': CACHE_FORMAT_VERSION,
+        }, sort_keys=True).encode()).hexdigest()
+        cache_path = os.path.join(cache_dir, 'employer_index.npz')
+
+        if os.path.exists(cache_path):
+            try:
+                with np.load(cache_path, allow_pickle=False) as cached:
+                    if str(cached['cache_key']) == cache_key:
+                        print(f"Loaded employer index from cache: {cache_path}")
+                        return cls._from_arrays(cached, threshold, analyzer, ngram_range, n_probe, probe_overlap,
+                                                collapse, cache_key)
+                print("Employer index cache is stale, rebuilding...")
+            except Exception as e:
+                print(f"Error reading employer index cache, rebuilding: {e}")
+
+        index = cls.from_excel(excel_file_path, threshold=threshold, analyzer=analyzer, ngram_range=ngram_range,
+                               n_probe=n_probe, probe_overlap=probe_overlap, collapse=collapse)
+        index.version = cache_key
+        try:
+            index.save(cache_path)
+            print(f"Employer index cached to {cache_path}")
+        except Exception as e:
+            print(f"Error caching employer index: {e}")
+        return index
+
+    @classmethod
+    def _from_arrays(cls, arrays, threshold, analyzer, ngram_range, n_probe, probe_overlap, collapse, version):
+        """Rebuild an index from cached arrays without refitting the vectorizer."""
+        index = cls.__new__(cls)
+        index.collapse = collapse
+        index.employer_names = arrays['names'].astype(object)
+        index.petition_counts = arrays['petition_counts']
+        index.variant_names = arrays['variant_names'].astype(object)
+        index.variant_indptr = arrays['variant_indptr']
+        index.rows_by_name = None
+        index.threshold = threshold
+        index.n_probe = n_probe
+        index.probe_overlap = probe_overlap
+        index.postings = None
+        index.analyzer = analyzer
+        index.ngram_range = tuple(ngram_range)
+
+        vocabulary = {str(term): i for i, term in enumerate(arrays['vocabulary'])}
+        index.vectorizer = TfidfVectorizer(analyzer=analyzer, ngram_range=index.ngram_range, norm=None,
+                                           preprocessor=index.preprocessor(), vocabulary=vocabulary)
+        index.vectorizer.idf_ = arrays['idf']
+        index.employer_matrix = sparse.csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']), shape=tuple(arrays['shape'])
+        )
+        index.version = version
+        index.last_batch_stats = None
+        return index
+
+    def save(self, cache_path):
+        """Write vocabulary, IDF weights, the sparse employer matrix, names and variants to an .npz file."""
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+
+        # Order terms by column so the vocabulary round-trips as a plain string array
+        vocabulary = np.empty(len(self.vectorizer.vocabulary_), dtype=object)
+        for term, column in self.vectorizer.vocabulary_.items():
+            vocabulary[column] = term
+
+        # Write to a temporary file first so a crashed run never leaves a half-written cache
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                cache_key=np.array(self.version),
+                names=self.employer_names.astype(str),
+                petition_counts=self.petition_counts,
+                variant_names=self.variant_names.astype(str),
+                variant_indptr=self.variant_indptr,
+                vocabulary=vocabulary.astype(str),
+                idf=self.vectorizer.idf_,
+                data=self.employer_matrix.data,
+                indices=self.employer_matrix.indices,
+                indptr=self.employer_matrix.indptr,
+                shape=np.array(self.employer_matrix.shape),
+            )
+        os.replace(tmp_path, cache_path)
+
+    def __len__(self):
+        return len(self.employer_names)
+
+    def row_of(self, employer_name):
+        if self.rows_by_name is None:
+            self.rows_by_name = {name: row for row, name in enumerate(self.employer_names)}
+        return self.rows_by_name[employer_name]
+
+    def petitions(self, employer_name):
+        """Return how many petition rows a matched employer stands for."""
+        return int(self.petition_counts[self.row_of(employer_name)])
+
+    def variants(self, employer_name):
+        """Return the sheet's spellings of a matched employer, most common first."""
+        row = self.row_of(employer_name)
+        return list(self.variant_names[self.variant_indptr[row]:self.variant_indptr[row + 1]])
+
+    @property
+    def blocking(self):
+        """Whether companies are scored against candidates() rather than every employer."""
+        return self.n_probe is not None and len(self) >= BLOCKING_MIN_EMPLOYERS
+
+    @property
+    def match_version(self):
+        """Identify the matches this index returns: its version plus the blocking setting."""
+        if not self.blocking:
+            return self.version
+        return f"{self.version}:probe{self.n_probe}x{self.probe_overlap}"
+
+    def get_postings(self):
+        """Return the n-gram -> employer inverted index (the transposed employer matrix), built on first use."""
+        if self.postings is None:
+            self.postings = self.employer_matrix.T.tocsr()
+        return self.postings
+
+    def candidates(self, query_row):
+        """Return the employer rows sharing most of the query's n_probe rarest n-grams, in row order.
+
+        A company scoring above the threshold against an employer shares most of its n-gram weight
+        with it, and the rare n-grams carry that weight, so the match almost always turns up in their
+        short posting lists; the common ones (' i', 'inc', 'llc') would pull in most of the table.
+        Requiring probe_overlap of the probed n-grams drops employers that only share a syllable.
+        """
+        postings = self.get_postings()
+        grams = query_row.indices
+        if len(grams) == 0:
+            return grams
+        document_frequency = postings.indptr[grams + 1] - postings.indptr[grams]
+        grams = grams[np.argsort(document_frequency, kind='stable')[:self.n_probe]]
+        probed = np.concatenate([postings.indices[postings.indptr[gram]:postings.indptr[gram + 1]] for gram in grams])
+        shared = np.bincount(probed, minlength=len(self))
+        return np.flatnonzero(shared >= max(1, int(np.ceil(self.probe_overlap * len(grams)))))
+
+    def transform(self, company_names):
+        """Vectorize company names into L2-normalized rows comparable with the employer matrix.
+
+        The old matcher refit the vectorizer on [company] + employers, so n-grams only the
+        company had still counted towards its norm with a document frequency of one. Those
+        n-grams are outside the fitted vocabulary here, so their weight is added back to the
+        norm explicitly to keep scores comparable with the 0.6 threshold.
+        """
+        query_matrix = self.vectorizer.transform(company_names).tocsr()
+        analyze = self.vectorizer.build_analyzer()
+        vocabulary = self.vectorizer.vocabulary_
+        unseen_idf = np.log((len(self) + 2) / 2) + 1
+
+        squared_norms = np.asarray(query_matrix.multiply(query_matrix).sum(axis=1)).ravel()
+        for row, company_name in enumerate(company_names):
+            unseen_counts = {}
+            for gram in analyze(company_name):
+                if gram not in vocabulary:
+                    unseen_counts[gram] = unseen_counts.get(gram, 0) + 1
+            squared_norms[row] += sum(count ** 2 for count in unseen_counts.values()) * unseen_idf ** 2
+
+        norms = np.sqrt(squared_norms)
+        norms[norms == 0] = 1.0
+        return (sparse.diags(1.0 / norms) @ query_matrix).tocsr()
+
+    def scores(self, company_name):
+        """Return the cosine similarity of a company name against every employer."""
+        query = self.transform([company_name])
+        return (query @ self.employer_matrix.T).toarray()[0]
+
+    def top_k(self, company_names, k=1, chunk_size=1024):
+        """Return the k best (employer_name, score) pairs for each company name.
+
+        Companies are vectorized and scored one chunk at a time with a sparse matrix
+        product, so peak memory is capped by chunk_size and a dense jobs x employers
+        matrix is never built. Only the top k entries per row are pulled out with
+        argpartition; employers sharing no n-gram with a company are never candidates.
+        With blocking on, each company is only scored against the candidates() sharing
+        most of its rarest n-grams instead of every employer sharing any n-gram.
+        """
+        company_names = list(company_names)
+        results = []
+        started = time.perf_counter()
+        candidate_count = 0
+
+        blocking = self.blocking
+        postings = self.get_postings()
+        for start in range(0, len(company_names), chunk_size):
+            query_matrix = self.transform(company_names[start:start + chunk_size])
+            if not blocking:
+                chunk_scores = (query_matrix @ postings).tocsr()
+
+            for row in range(query_matrix.shape[0]):
+                if not blocking:
+                    row_start, row_end = chunk_scores.indptr[row], chunk_scores.indptr[row + 1]
+                    row_scores = chunk_scores.data[row_start:row_end]
+                    row_employers = chunk_scores.indices[row_start:row_end]
+                else:
+                    row_employers = self.candidates(query_matrix[row])
+                    row_scores = (self.employer_matrix[row_employers] @ query_matrix[row].T).toarray().ravel()
+                    candidate_count += len(row_employers)
+
+                if len(row_scores) > k:
+                    top = np.argpartition(-row_scores, k - 1)[:k]
+                else:
+                    top = np.arange(len(row_scores))
+                # Highest score first; ties go to the earliest employer row like np.argmax
+                top = top[np.lexsort((row_employers[top], -row_scores[top]))]
+                results.append([(self.employer_names[row_employers[i]], float(row_scores[i])) for i in top])
+
+        elapsed = time.perf_counter() - started
+        self.last_batch_stats = {
+            'companies': len(company_names),
+            'seconds': elapsed,
+            'companies_per_second': len(company_names) / elapsed if elapsed > 0 else 0.0,
+            'candidates_per_company': (candidate_count / len(company_names)
+                                       if blocking and company_names else None),
+        }
+        return results
+
+    def match_batch(self, company_names, chunk_size=1024):
+        """Return (employer_name, score) or None per company, using the threshold like best_match."""
+        matches = []
+        for top in self.top_k(company_names, k=1, chunk_size=chunk_size):
+            if top and top[0][1] >= self.threshold:
+                matches.append(top[0])
+            else:
+                matches.append(None)
+        return matches
+
+    def best_match(self, company_name):
+        """Return (employer_name, score) for the best match above the threshold, or None."""
+        return self.match_batch([company_name])[0]
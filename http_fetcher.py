@@ -0,0 +1,86 @@
+"""Browser-free fetching of server-rendered LinkedIn result pages over a pooled requests.Session."""
+import random
+import threading
+from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import metrics
+
+
+# Guest result pages are served in pages of 25 cards
+DEFAULT_PAGE_SIZE = 25
+
+
+def page_url(url, start):
+    """Return url with its start query parameter set to start."""
+    parts = urlparse(url)
+    params = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != 'start']
+    params.append(('start', str(start)))
+    return urlunparse(parts._replace(query=urlencode(params, quote_via=quote)))
+
+
+class HttpJobFetcher:
+    """Page through search results (start=0,25,50,...) with keep-alive connections instead of Chrome."""
+
+    def __init__(self, user_agents, rate_limiter=None, page_size=DEFAULT_PAGE_SIZE, max_pages=10,
+                 timeout_seconds=15, max_connections=4):
+        self.rate_limiter = rate_limiter
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.timeout = timeout_seconds
+
+        # One session for every search thread; the adapter keeps up to max_connections sockets per host
+        # alive and retries throttled or failing requests with backoff, honouring Retry-After
+        retry = Retry(total=3, backoff_factor=2, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=('GET',), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': random.choice(user_agents),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+        self.lock = threading.Lock()
+        self.pages_fetched = 0
+        self.bytes_fetched = 0
+
+    def fetch(self, url):
+        """GET one page and return its HTML, or None if the server refused it."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        try:
+            with metrics.timer('http_fetch', mode='http'):
+                response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"Error fetching {url}: {e}")
+            metrics.count('http_responses', mode='http', status='error')
+            return None
+        metrics.count('http_responses', mode='http', status=response.status_code)
+        if response.status_code != 200:
+            print(f"Got HTTP {response.status_code} for {url}")
+            return None
+        with self.lock:
+            self.pages_fetched += 1
+            self.bytes_fetched += len(response.content)
+        metrics.count('http_bytes', len(response.content), mode='http')
+        return response.text
+
+    def iter_pages(self, url):
+        """Yield (start, html) for successive result pages until a page fails or max_pages is reached.
+
+        Callers stop iterating early once a page brings no new cards.
+        """
+        for page in range(self.max_pages):
+            start = page * self.page_size
+            html = self.fetch(page_url(url, start))
+            if html is None:
+                return
+            yield start, html
+
+    def close(self):
+        self.session.close()
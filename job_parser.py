@@ -0,0 +1,639 @@
+import multiprocessing
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+
+import soupsieve as sv
+from bs4 import BeautifulSoup, Tag
+
+from metrics import metrics
+
+try:
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+# Selectors that identify a job card on LinkedIn search result pages
+JOB_CARD_SELECTORS = [
+    'div.base-card',
+    '.job-search-card',
+    '.base-search-card',
+    'li[data-occludable-job-id]',
+    '.jobs-search__results-list li',
+    'div[data-entity-urn*="jobPosting"]',
+    '.jobs-search-results__list-item',
+    'div.job-search-card',
+    'li.jobs-search-results__list-item'
+]
+
+# Field selectors in priority order; the first selector whose first match has text (or href) wins
+TITLE_SELECTORS = [
+    'h3.base-search-card__title a',
+    'h3.base-search-card__title',
+    '.job-search-card__title a',
+    '.job-search-card__title',
+    'h3 a[data-tracking-control-name="public_jobs_jserp-result_search-card"]',
+    '.base-card__full-link',
+    'a[data-tracking-control-name="public_jobs_jserp-result_search-card"]',
+    '.job-search-card .job-search-card__title',
+    'h4.job-search-card__title',
+    'h3.job-search-card__title',
+    'a.job-search-card__title-link'
+]
+
+COMPANY_SELECTORS = [
+    'h4.base-search-card__subtitle',
+    '.job-search-card__subtitle-link',
+    '.base-search-card__subtitle a',
+    'h4 a[data-tracking-control-name="public_jobs_jserp-result_job-search-card-subtitle"]',
+    '.job-search-card__subtitle',
+    'h4.job-search-card__subtitle',
+    '.base-search-card__subtitle',
+    'a[data-tracking-control-name="public_jobs_jserp-result_job-search-card-subtitle"]',
+    '.job-search-card .job-search-card__subtitle'
+]
+
+LOCATION_SELECTORS = [
+    'span.job-search-card__location',
+    '.base-search-card__metadata span',
+    '.job-search-card__location',
+    'span[data-tracking-control-name="public_jobs_jserp-result_job-search-card-location"]'
+]
+
+URL_SELECTORS = [
+    'a.base-card__full-link',
+    '.base-search-card__title a',
+    'h3 a',
+    'a[data-tracking-control-name="public_jobs_jserp-result_search-card"]',
+    'a[href*="/jobs/view/"]',
+    '.job-search-card__title a',
+    'a.job-search-card__title-link',
+    '.job-search-card a[href*="/jobs/view/"]',
+    'a[data-entity-urn*="jobPosting"]'
+]
+
+DATE_SELECTORS = [
+    'time.job-search-card__listdate',
+    'time',
+    '.job-search-card__listdate--new',
+    'span[data-tracking-control-name="public_jobs_jserp-result_job-search-card-date"]'
+]
+
+# The first job link in a card identifies it when the same card appears twice
+VIEW_LINK_SELECTOR = 'a[href*="/jobs/view/"]'
+
+FIELD_SELECTORS = {
+    'title': TITLE_SELECTORS,
+    'company': COMPANY_SELECTORS,
+    'location': LOCATION_SELECTORS,
+    'url': URL_SELECTORS,
+    'date_posted': DATE_SELECTORS,
+}
+
+# Several selectors serve more than one field; each only needs to be evaluated once
+ALL_FIELD_SELECTORS = list(dict.fromkeys(selector for selectors in FIELD_SELECTORS.values() for selector in selectors))
+
+# Selector syntax handled by CompiledSelector directly: tag, .class and [attr], [attr="v"],
+# [attr*="v"], [attr^="v"], [attr$="v"] compounds joined by descendant combinators
+_COMPOUND = re.compile(r'(?:[^\s\[]+|\[[^\]]*\])+')
+_TAG_NAME = re.compile(r'^([a-zA-Z][\w-]*)')
+_CLASS_NAME = re.compile(r'\.([\w-]+)')
+_ATTRIBUTE = re.compile(r'\[([\w-]+)(?:([*^$]?=)"([^"]*)")?\]')
+_UNSUPPORTED = re.compile(r'[>+~:,()#]')
+
+
+class _Compound:
+    def __init__(self, compound):
+        tag_name = _TAG_NAME.match(compound)
+        self.tag_name = tag_name.group(1).lower() if tag_name else None
+        self.classes = frozenset(_CLASS_NAME.findall(re.sub(r'\[[^\]]*\]', '', compound)))
+        self.attributes = _ATTRIBUTE.findall(compound)
+
+    def matches(self, tag_name, classes, get_attribute):
+        if self.tag_name is not None and tag_name != self.tag_name:
+            return False
+        if self.classes and not self.classes.issubset(classes):
+            return False
+        for name, operator, expected in self.attributes:
+            value = get_attribute(name)
+            if value is None:
+                return False
+            if isinstance(value, list):
+                value = ' '.join(value)
+            if operator == '=' and value != expected:
+                return False
+            if operator == '*=' and expected not in value:
+                return False
+            if operator == '^=' and not value.startswith(expected):
+                return False
+            if operator == '$=' and not value.endswith(expected):
+                return False
+        return True
+
+
+class CompiledSelector:
+    def __init__(self, selector):
+        """Precompile a CSS selector into per-compound checks.
+
+        Selectors using syntax beyond that subset are left to soupsieve (BeautifulSoup)
+        or cssselect (lxml); `fallback` is set for those.
+        """
+        self.selector = selector
+        self.compounds = [_Compound(compound) for compound in _COMPOUND.findall(selector)]
+        self.fallback = bool(_UNSUPPORTED.search(selector))
+        self.soupsieve = sv.compile(selector) if self.fallback else None
+
+        # Key used to dispatch elements to the selectors that could match them
+        last = self.compounds[-1]
+        if last.tag_name is not None:
+            self.dispatch_key = ('tag', last.tag_name)
+        elif last.classes:
+            self.dispatch_key = ('class', min(last.classes))
+        else:
+            self.dispatch_key = None
+
+    def matches_soup(self, tag):
+        """Match a BeautifulSoup tag."""
+        if self.soupsieve is not None:
+            return self.soupsieve.match(tag)
+        if not self.compounds[-1].matches(tag.name, tag.get('class') or (), tag.get):
+            return False
+
+        # Descendant combinators only: match the remaining compounds against the nearest ancestors
+        remaining = len(self.compounds) - 2
+        node = tag.parent
+        while remaining >= 0 and node is not None and node.name != '[document]':
+            if self.compounds[remaining].matches(node.name, node.get('class') or (), node.get):
+                remaining -= 1
+            node = node.parent
+        return remaining < 0
+
+    def matches_lxml(self, element):
+        """Match an lxml element (fallback selectors are resolved by LxmlCardExtractor)."""
+        if not self.compounds[-1].matches(element.tag, (element.get('class') or '').split(), element.get):
+            return False
+
+        remaining = len(self.compounds) - 2
+        node = element.getparent()
+        while remaining >= 0 and node is not None:
+            if self.compounds[remaining].matches(node.tag, (node.get('class') or '').split(), node.get):
+                remaining -= 1
+            node = node.getparent()
+        return remaining < 0
+
+
+class CardExtractor:
+    """Single-pass job card discovery and field extraction over a BeautifulSoup tree."""
+
+    def __init__(self, parser='html.parser'):
+        self.parser = parser
+        self.card_selectors = [CompiledSelector(selector) for selector in JOB_CARD_SELECTORS]
+
+        # Dispatch every field selector by the tag name or class its last compound requires,
+        # so each element is only tested against selectors that could possibly match it
+        self.field_selectors = [CompiledSelector(selector) for selector in ALL_FIELD_SELECTORS]
+        self.selectors_by_key = {}
+        for selector in self.field_selectors:
+            self.selectors_by_key.setdefault(selector.dispatch_key, []).append(selector)
+        self.undispatched_selectors = self.selectors_by_key.pop(None, [])
+        # (field, selector) -> cards whose field came from that selector, for the page being extracted
+        self.selector_hits = Counter()
+        self.last_page_cards = 0
+
+    # Tree access, overridden by LxmlCardExtractor
+
+    def parse(self, html):
+        return BeautifulSoup(html, self.parser)
+
+    def child_elements(self, node):
+        return [child for child in node.children if isinstance(child, Tag)]
+
+    def descendant_elements(self, card):
+        return (element for element in card.descendants if isinstance(element, Tag))
+
+    def tag_and_classes(self, element):
+        return element.name, element.get('class') or ()
+
+    def matches(self, selector, element):
+        return selector.matches_soup(element)
+
+    def text(self, element):
+        return element.get_text(strip=True)
+
+    def prepare(self, root):
+        """Hook run once per parsed page before extraction."""
+
+    # Extraction
+
+    def is_card(self, element):
+        return any(self.matches(selector, element) for selector in self.card_selectors)
+
+    def find_cards(self, root):
+        """Walk the tree once in document order and return each outermost card element."""
+        cards = []
+        stack = list(reversed(self.child_elements(root)))
+        while stack:
+            node = stack.pop()
+            if self.is_card(node):
+                # Cards nested inside a card belong to it, so the subtree is not searched
+                cards.append(node)
+                continue
+            stack.extend(reversed(self.child_elements(node)))
+        return cards
+
+    def candidate_selectors(self, element):
+        tag_name, classes = self.tag_and_classes(element)
+        candidates = list(self.selectors_by_key.get(('tag', tag_name), ()))
+        for class_name in classes:
+            candidates.extend(self.selectors_by_key.get(('class', class_name), ()))
+        candidates.extend(self.undispatched_selectors)
+        return candidates
+
+    def extract_card(self, card):
+        """Pull title/company/location/url/date from one card in a single traversal.
+
+        Returns the job data and the card's first /jobs/view/ link, used to drop repeated cards.
+        """
+        first_matches = {}
+        for element in self.descendant_elements(card):
+            for selector in self.candidate_selectors(element):
+                if selector.selector not in first_matches and self.matches(selector, element):
+                    first_matches[selector.selector] = element
+
+        job_data = {}
+        texts = {}
+
+        def text_of(element):
+            # Keyed by id(): BeautifulSoup hashes a tag by serializing it
+            if id(element) not in texts:
+                texts[id(element)] = self.text(element)
+            return texts[id(element)]
+
+        for field in ('title', 'company', 'location', 'date_posted'):
+            for selector in FIELD_SELECTORS[field]:
+                element = first_matches.get(selector)
+                if element is not None and text_of(element):
+                    job_data[field] = text_of(element)
+                    self.selector_hits[(field, selector)] += 1
+                    # Also try to get URL from title link
+                    if field == 'title' and element.get('href'):
+                        job_data['url'] = element.get('href')
+                        self.selector_hits[('url', selector)] += 1
+                    break
+
+        if 'url' not in job_data:
+            for selector in URL_SELECTORS:
+                element = first_matches.get(selector)
+                if element is not None and element.get('href'):
+                    job_data['url'] = element.get('href')
+                    self.selector_hits[('url', selector)] += 1
+                    break
+
+        view_link = first_matches.get(VIEW_LINK_SELECTOR)
+        return job_data, view_link.get('href', '') if view_link is not None else ''
+
+    def extract_tree(self, root):
+        """Return one job data dict per unique card in an already parsed page."""
+        self.prepare(root)
+        self.selector_hits.clear()
+        jobs = []
+        seen_urls = set()
+        cards = self.find_cards(root)
+        for card in cards:
+            job_data, card_url = self.extract_card(card)
+            # Cards repeated on the page share their job link; cards without one are kept
+            if card_url:
+                if card_url in seen_urls:
+                    continue
+                seen_urls.add(card_url)
+            jobs.append(job_data)
+
+        # One metrics update per page keeps the per-card loop free of locking
+        self.last_page_cards = len(cards)
+        metrics.count('cards_found', len(cards))
+        metrics.count('cards_duplicate', len(cards) - len(jobs))
+        metrics.count_labelled('selector_hits', self.selector_hits, 'field', 'selector')
+        return jobs
+
+    def extract(self, html):
+        """Parse a result page and return one job data dict per unique card."""
+        with metrics.timer('parse'):
+            root = self.parse(html)
+        with metrics.timer('extract'):
+            return self.extract_tree(root)
+
+
+# Text inside these elements is not part of BeautifulSoup's get_text()
+_NON_TEXT_TAGS = frozenset(['script', 'style', 'template'])
+
+
+class LxmlCardExtractor(CardExtractor):
+    """The single-pass extractor on an lxml tree, which parses pages far faster than html.parser."""
+
+    def __init__(self):
+        if not LXML_AVAILABLE:
+            raise ImportError("lxml and cssselect are required for the lxml parser engine")
+        super().__init__()
+        self.html_parser = etree.HTMLParser()
+        self.fallback_selectors = [(selector, CSSSelector(selector.selector))
+                                   for selector in self.card_selectors + self.field_selectors if selector.fallback]
+        self.fallback_hits = {}
+
+    def parse(self, html):
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        return etree.fromstring(html, self.html_parser)
+
+    def prepare(self, root):
+        # Selectors the precompiler does not handle are evaluated once per page with cssselect
+        self.fallback_hits = {selector.selector: set(css(root)) for selector, css in self.fallback_selectors}
+
+    def child_elements(self, node):
+        return [child for child in node if isinstance(child.tag, str)]
+
+    def descendant_elements(self, card):
+        return (element for element in card.iterdescendants() if isinstance(element.tag, str))
+
+    def tag_and_classes(self, element):
+        return element.tag, (element.get('class') or '').split()
+
+    def matches(self, selector, element):
+        if selector.fallback:
+            return element in self.fallback_hits[selector.selector]
+        return selector.matches_lxml(element)
+
+    def text(self, element):
+        """lxml equivalent of BeautifulSoup's get_text(strip=True)."""
+        parts = []
+        _collect_text(element, parts)
+        return ''.join(part.strip() for part in parts)
+
+
+def _collect_text(element, parts):
+    # Comments and processing instructions have a non-string tag; only their tail is text
+    if not isinstance(element.tag, str) or element.tag in _NON_TEXT_TAGS:
+        return
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+
+# Runs in the browser via execute_script. Returns {job, view} for every outermost card that an
+# earlier call hasn't returned yet and marks it, applying the same selector priorities and
+# get_text(strip=True) text rules as CardExtractor.extract_card. Arguments: INCREMENTAL_EXTRACT_ARGS.
+INCREMENTAL_EXTRACT_SCRIPT = """
+const [cardQuery, fieldSelectors, urlSelectors, viewLinkSelector] = arguments;
+const nonText = new Set(['SCRIPT', 'STYLE', 'TEMPLATE']);
+function text(element) {
+    const parts = [];
+    const walker = document.createTreeWalker(element, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+        let hidden = false;
+        for (let parent = node.parentElement; parent && parent !== element.parentElement; parent = parent.parentElement) {
+            if (nonText.has(parent.tagName)) { hidden = true; break; }
+        }
+        const value = hidden ? '' : node.nodeValue.trim();
+        if (value) { parts.push(value); }
+    }
+    return parts.join('');
+}
+const results = [];
+for (const card of document.querySelectorAll(cardQuery)) {
+    if (card.hasAttribute('data-crawler-seen') || (card.parentElement && card.parentElement.closest(cardQuery))) {
+        continue;
+    }
+    card.setAttribute('data-crawler-seen', '');
+    const job = {};
+    for (const [field, selectors] of fieldSelectors) {
+        for (const selector of selectors) {
+            const element = card.querySelector(selector);
+            const value = element ? text(element) : '';
+            if (value) {
+                job[field] = value;
+                if (field === 'title' && element.getAttribute('href')) { job.url = element.getAttribute('href'); }
+                break;
+            }
+        }
+    }
+    if (!('url' in job)) {
+        for (const selector of urlSelectors) {
+            const element = card.querySelector(selector);
+            if (element && element.getAttribute('href')) { job.url = element.getAttribute('href'); break; }
+        }
+    }
+    const view = card.querySelector(viewLinkSelector);
+    results.push({job: job, view: view ? (view.getAttribute('href') || '') : ''});
+}
+return results;
+"""
+INCREMENTAL_EXTRACT_ARGS = (
+    ', '.join(JOB_CARD_SELECTORS),
+    [[field, FIELD_SELECTORS[field]] for field in ('title', 'company', 'location', 'date_posted')],
+    URL_SELECTORS,
+    VIEW_LINK_SELECTOR,
+)
+
+
+_POSTED_AGE = re.compile(r'(\d+)\s*(second|minute|hour|day|week|month)s?\s+ago', re.IGNORECASE)
+_AGE_UNIT_SECONDS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400, 'week': 604800, 'month': 2592000}
+
+
+def parse_posted_age(text):
+    """Return the age in seconds of a listing date like '12 minutes ago', or None if it can't be read."""
+    if not text:
+        return None
+    if 'just now' in text.lower():
+        return 0
+    match = _POSTED_AGE.search(text)
+    if not match:
+        return None
+    return int(match.group(1)) * _AGE_UNIT_SECONDS[match.group(2).lower()]
+
+
+def get_card_extractor(engine='auto'):
+    """Return the extractor for 'lxml', 'bs4', or 'auto' (lxml when installed, else BeautifulSoup)."""
+    if engine == 'auto':
+        engine = 'lxml' if LXML_AVAILABLE else 'bs4'
+    if engine == 'lxml':
+        return LxmlCardExtractor()
+    if engine == 'bs4':
+        return CardExtractor()
+    raise ValueError(f"Unknown parser engine '{engine}', expected 'auto', 'lxml' or 'bs4'")
+
+
+# Fields an extraction worker sends back per card, in order; missing fields travel as None
+JOB_DATA_FIELDS = ('title', 'company', 'location', 'date_posted', 'url')
+
+# Extractors of the current worker process, one per engine, built on a worker's first page
+_worker_extractors = {}
+
+
+def extract_page_rows(html, engine='auto'):
+    """Worker task: parse and extract one page, returning (rows, card count, selector hits).
+
+    Rows are plain tuples in JOB_DATA_FIELDS order, which pickle far smaller than dicts.
+    """
+    extractor = _worker_extractors.get(engine)
+    if extractor is None:
+        extractor = _worker_extractors[engine] = get_card_extractor(engine)
+    job_datas = extractor.extract(html)
+    rows = [tuple(job_data.get(field) for field in JOB_DATA_FIELDS) for job_data in job_datas]
+    return rows, extractor.last_page_cards, dict(extractor.selector_hits)
+
+
+def rows_to_job_datas(rows):
+    return [{field: value for field, value in zip(JOB_DATA_FIELDS, row) if value is not None} for row in rows]
+
+
+class PageExtractionPool:
+    """Parse and extract result pages on worker processes, so several pages use several cores.
+
+    Pages under min_page_bytes stay in the calling thread, as does everything when there are
+    fewer than two workers, since pickling the HTML and the results would cost more than the
+    parse saves. extract() can be called from many threads at once; each gets its own
+    in-process extractor for the pages it keeps.
+    """
+
+    def __init__(self, engine='auto', workers=None, min_page_bytes=16384, min_parallel_pages=2):
+        if workers is None:
+            # Leave a core for the crawler's own threads and browsers
+            workers = max(0, (os.cpu_count() or 1) - 1)
+        self.engine = engine
+        self.workers = workers
+        self.min_page_bytes = min_page_bytes
+        self.min_parallel_pages = min_parallel_pages
+        self.executor = None
+        self.lock = threading.Lock()
+        self.thread_state = threading.local()
+
+    @property
+    def parallel(self):
+        return self.workers >= 2
+
+    def local_extractor(self):
+        extractor = getattr(self.thread_state, 'extractor', None)
+        if extractor is None:
+            extractor = self.thread_state.extractor = get_card_extractor(self.engine)
+        return extractor
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                # spawn: forking a process that runs browser and search threads can deadlock the child
+                self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self.executor
+
+    def collect(self, result):
+        """Turn a worker's result into job data dicts, recording its counts in the run metrics."""
+        rows, cards, selector_hits = result
+        metrics.count('cards_found', cards)
+        metrics.count('cards_duplicate', cards - len(rows))
+        metrics.count_labelled('selector_hits', selector_hits, 'field', 'selector')
+        return rows_to_job_datas(rows)
+
+    def fall_back_to_serial(self, error):
+        print(f"Extraction worker failed ({error}), extracting in-process from now on")
+        self.workers = 0
+
+    def extract(self, html):
+        """Return one job data dict per unique card on a page, like CardExtractor.extract."""
+        if not self.parallel or len(html) < self.min_page_bytes:
+            return self.local_extractor().extract(html)
+        try:
+            with metrics.timer('extract_in_worker'):
+                result = self.get_executor().submit(extract_page_rows, html, self.engine).result()
+        except BrokenProcessPool as e:
+            self.fall_back_to_serial(e)
+            return self.local_extractor().extract(html)
+        return self.collect(result)
+
+    def extract_many(self, htmls):
+        """Extract several pages, in order, spreading them over the workers."""
+        htmls = list(htmls)
+        if not self.parallel or len(htmls) < self.min_parallel_pages or \
+                sum(len(html) for html in htmls) < self.min_page_bytes * self.min_parallel_pages:
+            extractor = self.local_extractor()
+            return [extractor.extract(html) for html in htmls]
+        try:
+            with metrics.timer('extract_in_worker'):
+                results = list(self.get_executor().map(extract_page_rows, htmls, repeat(self.engine)))
+        except BrokenProcessPool as e:
+            self.fall_back_to_serial(e)
+            extractor = self.local_extractor()
+            return [extractor.extract(html) for html in htmls]
+        return [self.collect(result) for result in results]
+
+    def close(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+
+def find_job_cards_multiple_selectors(soup):
+    """Original card discovery: run every card selector, then drop cards repeating a job link.
+
+    Kept as the reference implementation CardExtractor is checked against.
+    """
+    job_cards = []
+    for selector in JOB_CARD_SELECTORS:
+        job_cards.extend(soup.select(selector))
+
+    unique_cards = []
+    seen_urls = set()
+    for card in job_cards:
+        url_elements = card.select('a[href*="/jobs/view/"]')
+        if url_elements:
+            url = url_elements[0].get('href', '')
+            if url and url not in seen_urls:
+                seen_urls.add(url)
+                unique_cards.append(card)
+        else:
+            unique_cards.append(card)
+    return unique_cards
+
+
+def extract_job_data_multiple_selectors(card):
+    """Original extraction: try each field selector with select_one until one has data."""
+    job_data = {}
+
+    for selector in TITLE_SELECTORS:
+        title_element = card.select_one(selector)
+        if title_element and title_element.get_text(strip=True):
+            job_data['title'] = title_element.get_text(strip=True)
+            # Also try to get URL from title link
+            if title_element.get('href'):
+                job_data['url'] = title_element['href']
+            break
+
+    for field, selectors in (('company', COMPANY_SELECTORS), ('location', LOCATION_SELECTORS)):
+        for selector in selectors:
+            element = card.select_one(selector)
+            if element and element.get_text(strip=True):
+                job_data[field] = element.get_text(strip=True)
+                break
+
+    if 'url' not in job_data:
+        for selector in URL_SELECTORS:
+            url_element = card.select_one(selector)
+            if url_element and url_element.get('href'):
+                job_data['url'] = url_element['href']
+                break
+
+    for selector in DATE_SELECTORS:
+        date_element = card.select_one(selector)
+        if date_element and date_element.get_text(strip=True):
+            job_data['date_posted'] = date_element.get_text(strip=True)
+            break
+
+    return job_data
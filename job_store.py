@@ -0,0 +1,307 @@
+import argparse
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from datetime import datetime
+
+from dedup import job_key
+
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Fold the journal into the snapshot once it grows past this many bytes
+DEFAULT_JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+
+class JsonJobStore:
+    """Original storage: the whole job list lives in one JSON file that is rewritten on save."""
+
+    # Every save rewrites the whole file, so callers should save once per run rather than per batch
+    incremental_saves = False
+
+    def __init__(self, path):
+        self.path = str(path)
+
+    def load_jobs(self):
+        """Load all stored jobs."""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r') as f:
+            jobs = json.load(f)
+        # Accept a single record for consistency with older files
+        return jobs if isinstance(jobs, list) else [jobs]
+
+    def _write(self, jobs):
+        with open(self.path, 'w') as f:
+            json.dump(jobs, f, indent=4)
+
+    def save_jobs(self, jobs, prune_before=None):
+        """Upsert jobs by job id and drop jobs scraped before prune_before."""
+        stored = self.load_jobs()
+        if prune_before is not None:
+            stored = [job for job in stored if datetime.strptime(job['scraped_date'], DATE_FORMAT) >= prune_before]
+
+        positions = {job_key(job): i for i, job in enumerate(stored)}
+        for job in jobs:
+            key = job_key(job)
+            if key in positions:
+                # Never reset the sent flag of a job that has already been emailed
+                previous = stored[positions[key]]
+                stored[positions[key]] = dict(job, email_sent=previous.get('email_sent', False) or job.get('email_sent', False))
+            else:
+                positions[key] = len(stored)
+                stored.append(job)
+        self._write(stored)
+
+    def pending_jobs(self):
+        """Return jobs that have not been emailed yet."""
+        return [job for job in self.load_jobs() if not job.get('email_sent')]
+
+    def mark_email_sent(self, jobs):
+        """Set email_sent on the given jobs."""
+        keys = {job_key(job) for job in jobs}
+        stored = self.load_jobs()
+        for job in stored:
+            if job_key(job) in keys:
+                job['email_sent'] = True
+        self._write(stored)
+
+    def close(self):
+        pass
+
+
+class SqliteJobStore:
+    """SQLite storage with indexed upserts keyed by job id, so runs only touch changed rows."""
+
+    incremental_saves = True
+
+    def __init__(self, path):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                scraped_date TEXT NOT NULL,
+                email_sent INTEGER NOT NULL DEFAULT 0,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_scraped_date ON jobs (scraped_date);
+            CREATE INDEX IF NOT EXISTS idx_jobs_email_sent ON jobs (email_sent);
+        """)
+        self.connection.commit()
+
+    def _rows_to_jobs(self, rows):
+        jobs = []
+        for email_sent, record in rows:
+            job = json.loads(record)
+            job['email_sent'] = bool(email_sent)
+            jobs.append(job)
+        return jobs
+
+    def load_jobs(self):
+        """Load all stored jobs in insertion order."""
+        rows = self.connection.execute("SELECT email_sent, record FROM jobs ORDER BY rowid").fetchall()
+        return self._rows_to_jobs(rows)
+
+    def save_jobs(self, jobs, prune_before=None):
+        """Upsert jobs by job id and drop jobs scraped before prune_before."""
+        with self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO jobs (job_id, scraped_date, email_sent, record) VALUES (?, ?, ?, ?)
+                ON CONFLICT (job_id) DO UPDATE SET
+                    scraped_date = excluded.scraped_date,
+                    email_sent = MAX(jobs.email_sent, excluded.email_sent),
+                    record = excluded.record
+                """,
+                [(job_key(job), job['scraped_date'], int(bool(job.get('email_sent'))), json.dumps(job)) for job in jobs],
+            )
+            if prune_before is not None:
+                # scraped_date is zero-padded, so string order is chronological order
+                self.connection.execute("DELETE FROM jobs WHERE scraped_date < ?", (prune_before.strftime(DATE_FORMAT),))
+
+    def pending_jobs(self):
+        """Return jobs that have not been emailed yet."""
+        rows = self.connection.execute("SELECT email_sent, record FROM jobs WHERE email_sent = 0 ORDER BY rowid").fetchall()
+        return self._rows_to_jobs(rows)
+
+    def mark_email_sent(self, jobs):
+        """Set email_sent on the given jobs with a single UPDATE."""
+        keys = list({job_key(job) for job in jobs})
+        if not keys:
+            return
+        with self.connection:
+            # json_each avoids SQLite's bound-parameter limit for large batches
+            self.connection.execute(
+                "UPDATE jobs SET email_sent = 1 WHERE job_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(keys),),
+            )
+
+    def close(self):
+        self.connection.close()
+
+
+class JournalJobStore:
+    """File-based storage that appends changes to a JSONL journal on top of a JSON snapshot.
+
+    Each run appends only its new jobs and sent flags, so writes are O(new jobs) and git
+    diffs stay small. Readers replay the snapshot and then the journal into the latest
+    state per job id; compact() folds the journal back into the snapshot.
+    """
+
+    incremental_saves = True
+
+    def __init__(self, journal_path, snapshot_path, compact_bytes=DEFAULT_JOURNAL_COMPACT_BYTES):
+        self.path = str(journal_path)
+        self.snapshot_path = str(snapshot_path)
+        self.compact_bytes = compact_bytes
+
+    def _load_state(self):
+        """Replay the snapshot and journal into an ordered job_id -> job mapping."""
+        state = OrderedDict()
+        for job in JsonJobStore(self.snapshot_path).load_jobs():
+            state[job_key(job)] = job
+
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write can leave a partial last line behind
+                    print(f"Skipping unreadable journal line {line_number} in {self.path}")
+                    continue
+                self._apply(state, event)
+        return state
+
+    def _apply(self, state, event):
+        op = event.get('op')
+        if op == 'upsert':
+            job = event['job']
+            key = job_key(job)
+            previous = state.get(key)
+            if previous is not None and previous.get('email_sent'):
+                job = dict(job, email_sent=True)
+            state[key] = job
+        elif op == 'email_sent':
+            for key in event['job_ids']:
+                if key in state:
+                    state[key]['email_sent'] = True
+        elif op == 'prune':
+            # scraped_date is zero-padded, so string order is chronological order
+            for key in [key for key, job in state.items() if job['scraped_date'] < event['before']]:
+                del state[key]
+
+    def _append(self, events):
+        # Start on a fresh line if a previous writer died before finishing its last line
+        needs_newline = False
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+        with open(self.path, 'a') as f:
+            if needs_newline:
+                f.write('\n')
+            for event in events:
+                f.write(json.dumps(event) + '\n')
+
+    def load_jobs(self):
+        """Load the latest state of every stored job."""
+        return list(self._load_state().values())
+
+    def save_jobs(self, jobs, prune_before=None):
+        """Append upserts (and a prune marker) to the journal."""
+        events = [{'op': 'upsert', 'job': job} for job in jobs]
+        if prune_before is not None:
+            events.append({'op': 'prune', 'before': prune_before.strftime(DATE_FORMAT)})
+        self._append(events)
+        self.compact()
+
+    def pending_jobs(self):
+        """Return jobs that have not been emailed yet."""
+        return [job for job in self.load_jobs() if not job.get('email_sent')]
+
+    def mark_email_sent(self, jobs):
+        """Append one email_sent event for the given jobs."""
+        keys = sorted({job_key(job) for job in jobs})
+        if keys:
+            self._append([{'op': 'email_sent', 'job_ids': keys}])
+            self.compact()
+
+    def compact(self, force=False):
+        """Fold the journal into the snapshot once it crosses compact_bytes (or always with force)."""
+        if not os.path.exists(self.path):
+            return False
+        journal_size = os.path.getsize(self.path)
+        if not force and journal_size < self.compact_bytes:
+            return False
+
+        jobs = self.load_jobs()
+        # Replace the snapshot atomically before truncating the journal it now contains
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(jobs, f, indent=4)
+        os.replace(tmp_path, self.snapshot_path)
+        open(self.path, 'w').close()
+        print(f"Compacted {journal_size} byte journal into {self.snapshot_path} ({len(jobs)} jobs)")
+        return True
+
+    def close(self):
+        pass
+
+
+STORE_BACKENDS = ('json', 'sqlite', 'journal')
+
+
+def open_job_store(config):
+    """Open the job store selected by config['storage_backend'] (json by default)."""
+    backend = config.get('storage_backend', 'json')
+    if backend == 'json':
+        return JsonJobStore(config['database_file'])
+    if backend == 'sqlite':
+        return SqliteJobStore(config['sqlite_file'])
+    if backend == 'journal':
+        return JournalJobStore(config['journal_file'], config['database_file'],
+                               config.get('journal_compact_bytes', DEFAULT_JOURNAL_COMPACT_BYTES))
+    raise ValueError(f"Unknown storage backend '{backend}', expected one of {STORE_BACKENDS}")
+
+
+def import_json(json_path, sqlite_path):
+    """Copy an existing database.json into a SQLite store."""
+    source = JsonJobStore(json_path)
+    target = SqliteJobStore(sqlite_path)
+    try:
+        jobs = source.load_jobs()
+        target.save_jobs(jobs)
+        print(f"Imported {len(jobs)} jobs from {json_path} into {sqlite_path} "
+              f"({len(target.load_jobs())} unique job ids)")
+    finally:
+        target.close()
+
+
+if __name__ == "__main__":
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    parser = argparse.ArgumentParser(description="Job store maintenance")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    import_parser = subcommands.add_parser('import', help="Import database.json into SQLite")
+    import_parser.add_argument('--json', default=os.path.join(data_dir, 'database.json'))
+    import_parser.add_argument('--sqlite', default=os.path.join(data_dir, 'jobs.db'))
+    compact_parser = subcommands.add_parser('compact', help="Fold the JSONL journal into the database.json snapshot")
+    compact_parser.add_argument('--journal', default=os.path.join(data_dir, 'jobs.jsonl'))
+    compact_parser.add_argument('--snapshot', default=os.path.join(data_dir, 'database.json'))
+    compact_parser.add_argument('--threshold-bytes', type=int, default=DEFAULT_JOURNAL_COMPACT_BYTES)
+    compact_parser.add_argument('--force', action='store_true', help="Compact regardless of journal size")
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        import_json(args.json, args.sqlite)
+    elif args.command == 'compact':
+        store = JournalJobStore(args.journal, args.snapshot, args.threshold_bytes)
+        if not store.compact(force=args.force):
+            print(f"Journal {args.journal} is below the compaction threshold, nothing to do")
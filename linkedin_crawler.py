@@ -1,9 +1,10 @@
-import requests
-from bs4 import BeautifulSoup
 import json
 import os
+import queue
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -11,10 +12,47 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException
 from pathlib import Path
+from async_pipeline import AIOHTTP_AVAILABLE, AsyncJobPipeline
+from dedup import JobIndex, SeenJobStore, job_key
+from driver_manager import DriverPool, driver_is_alive, resolve_driver_path
+from job_parser import (INCREMENTAL_EXTRACT_ARGS, INCREMENTAL_EXTRACT_SCRIPT, JOB_CARD_SELECTORS,
+                        PageExtractionPool, extract_job_data_multiple_selectors, parse_posted_age)
+from http_fetcher import HttpJobFetcher
+from job_store import open_job_store
+from metrics import metrics, profile_run, write_run_metrics
+from rate_limit import HostRateLimiter
+from searches import expand_searches
+
+
+CARD_SELECTOR_QUERY = ', '.join(JOB_CARD_SELECTORS)
+
+# Per-search tallies kept while turning card data into job records
+EXTRACTION_COUNTS = ('cards', 'valid', 'masked', 'missing_data', 'no_url')
+
+# Finds the "Show more" / "See more jobs" button the same way the crawler always has
+FIND_SHOW_MORE_JS = """
+const button = Array.from(document.querySelectorAll('button')).find(
+    b => /Show more|See more jobs/.test(b.textContent));
+"""
+
+# One round trip per poll: card count, Show-more state and the listing date of the last card.
+# Only outermost matches count, since a card's li and its div.base-card both match the selectors.
+SCROLL_STATE_SCRIPT = FIND_SHOW_MORE_JS + """
+const cards = Array.from(document.querySelectorAll(arguments[0])).filter(
+    card => !(card.parentElement && card.parentElement.closest(arguments[0])));
+let buttonState = 'absent';
+if (button) {
+    buttonState = button.disabled ? 'disabled' : (button.offsetParent === null ? 'hidden' : 'visible');
+}
+const last = cards.length ? cards[cards.length - 1].querySelector('time') : null;
+return {cards: cards.length, button: buttonState, last_posted: last ? last.textContent.trim() : null};
+"""
+
+CLICK_SHOW_MORE_SCRIPT = FIND_SHOW_MORE_JS + """
+if (button) { button.click(); }
+"""
 
 
 class LinkedInJobCrawler:
@@ -31,6 +69,11 @@ class LinkedInJobCrawler:
             config_file = base_dir / "carwler.json"
         
         database_path = base_dir / "database.json"
+        sqlite_path = base_dir / "jobs.db"
+        journal_path = base_dir / "jobs.jsonl"
+        driver_cache_path = base_dir / "cache" / "chromedriver.json"
+        metrics_path = base_dir / "metrics"
+        seen_path = base_dir / "seen"
         
         # Default configuration
         self.config = {
@@ -38,11 +81,96 @@ class LinkedInJobCrawler:
             'keywords': ['python', 'developer', 'engineer', 'data engineer', 'airflow', 'etl', 'aws', 'snowflake', 'databricks'],
             'excluded_keywords': ['5+ years', '4+ years', 'manager', 'director'],
             'database_file': str(database_path),
+            # 'json' rewrites database_file, 'sqlite' upserts into sqlite_file,
+            # 'journal' appends to journal_file and compacts into database_file
+            'storage_backend': 'json',
+            'sqlite_file': str(sqlite_path),
+            'journal_file': str(journal_path),
+            'journal_compact_bytes': 1024 * 1024,
             'user_agents': [
                 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             ],
+            'parser_engine': 'auto',  # 'lxml', 'bs4', or 'auto' (lxml when installed)
+            # Result pages are parsed on worker processes; workers None means one per core but one,
+            # and fewer than 2 keeps extraction in-process. Pages under min_page_bytes stay in-process
+            'extraction': {
+                'workers': None,
+                'min_page_bytes': 16384
+            },
+            'daemon_interval_seconds': 600,  # daemon.py: seconds between crawl+match cycle starts
+            # Each run writes per-stage timings and counters to metrics_dir as <job>.json and a
+            # Prometheus textfile <job>.prom; profile ('cpu', 'memory' or 'both') also dumps a
+            # cProfile/tracemalloc profile of the run there
+            'metrics_dir': str(metrics_path),
+            'metrics': {
+                'enabled': True,
+                'profile': None
+            },
+            # pipeline.py matches, emails and saves new jobs while the crawl is still running, once
+            # match_batch_size jobs have arrived or match_interval_seconds have passed since the last batch
+            'stream': {
+                'match_batch_size': 25,
+                'match_interval_seconds': 60
+            },
+            # Searches to crawl; each spec expands to every keyword x location x experience
+            # combination, e.g. {'keywords': ['airflow', 'snowflake'], 'locations': ['United States'],
+            # 'experience': ['2,3'], 'time_posted': 'r86400'}. Empty means crawl job_url only.
+            'searches': [],
+            'max_browsers': 2,
+            # Browsers stay warm across pages and repeated run_once calls, and are recycled after
+            # recycle_after_pages pages or recycle_memory_growth_mb of growth. profile_dir keeps a
+            # Chrome profile per browser on disk so a restarted process starts with a warm cache.
+            'browser': {
+                'recycle_after_pages': 50,
+                'recycle_memory_growth_mb': 500,
+                'warm_between_runs': True,
+                'profile_dir': None
+            },
+            'driver_cache_file': str(driver_cache_path),
+            # Job keys seen in the last horizon_days, one partition file per day in seen_jobs_dir,
+            # so a posting that stays listed is not reported again once it leaves the job store.
+            # bloom keeps each day in a fixed-size Bloom filter sized for expected_jobs_per_day;
+            # a horizon of 0 turns the seen-job store off
+            'seen_jobs_dir': str(seen_path),
+            'seen_jobs': {
+                'horizon_days': 30,
+                'bloom': False,
+                'expected_jobs_per_day': 5000,
+                'false_positive_rate': 0.001
+            },
+            # 'browser' renders the page in Chrome; 'http' pages through server-rendered results
+            # with a keep-alive session; 'async' runs all such searches through one asyncio
+            # pipeline with several pages in flight. Searches can override it with their own fetch_mode.
+            'fetch_mode': 'browser',
+            'http': {
+                'max_pages': 10,
+                'timeout_seconds': 15,
+                'max_connections': 4,
+                # async mode only: token bucket per host and pipeline sizes
+                'requests_per_second': 1.0,
+                'burst': 2,
+                'pages_in_flight': 2,
+                'queue_size': 8,
+                'parse_workers': 2,
+                'max_retries': 4
+            },
+            # Minimum gap between page loads to the same host, across all browsers
+            'host_min_interval_seconds': 2.0,
+            # human_like_scroll waits for new cards instead of sleeping; it stops at target_cards,
+            # after time_budget_seconds, or once the last card is older than max_card_age_seconds
+            'scroll': {
+                'target_cards': None,
+                'time_budget_seconds': 60,
+                'max_card_age_seconds': None,
+                'wait_timeout_seconds': 8,
+                'max_rounds': 15
+            },
+            # 'page_source' parses the whole page after scrolling; 'incremental' pulls only newly
+            # loaded cards from the browser each scroll round and stops after a run of stored jobs
+            'browser_extraction': 'page_source',
+            'stop_after_known_jobs': 10,
             'request_delay': {
                 'min_seconds': 3,
                 'max_seconds': 7
@@ -57,6 +185,11 @@ class LinkedInJobCrawler:
                 custom_config = json.load(f)
                 # Update config but ensure database_file uses the correct local path
                 custom_config['database_file'] = str(database_path)
+                custom_config['sqlite_file'] = str(sqlite_path)
+                custom_config['journal_file'] = str(journal_path)
+                custom_config['driver_cache_file'] = str(driver_cache_path)
+                custom_config['metrics_dir'] = str(metrics_path)
+                custom_config['seen_jobs_dir'] = str(seen_path)
                 self.config.update(custom_config)
         else:
             # Create parent directory if it doesn't exist
@@ -65,21 +198,51 @@ class LinkedInJobCrawler:
             with open(config_file, 'w') as f:
                 json.dump(self.config, f, indent=4)
                 
-        # Initialize the webdriver
-        self.driver = None
-        
-        # Load previous jobs
+        # Browsers are started on demand, up to max_browsers, and shared by the search threads
+        browser_config = self.config['browser']
+        self.driver_pool = DriverPool(
+            self.create_driver,
+            max(1, int(self.config['max_browsers'])),
+            recycle_after_pages=browser_config.get('recycle_after_pages', 50),
+            recycle_memory_growth_mb=browser_config.get('recycle_memory_growth_mb', 500)
+        )
+        self.driver_path = None
+        self.driver_path_lock = threading.Lock()
+        self.rate_limiter = HostRateLimiter(self.config['host_min_interval_seconds'])
+        self.http_fetcher = None
+        self.http_fetcher_lock = threading.Lock()
+        
+        # Every fetch mode parses its result pages through the extraction pool
+        extraction_config = self.config['extraction']
+        self.extraction_pool = PageExtractionPool(
+            self.config['parser_engine'],
+            workers=extraction_config.get('workers'),
+            min_page_bytes=extraction_config.get('min_page_bytes', 16384)
+        )
+        
+        # Open the configured job store
+        self.store = open_job_store(self.config)
+        
+        # Load previous jobs and index them once for constant-time duplicate checks
         self.previous_jobs = self.load_previous_jobs()
-
-        
-    def setup_driver(self):
-        """Set up Selenium WebDriver with enhanced stealth capabilities."""
-        if self.driver is not None:
-            try:
-                self.driver.quit()
-            except:
-                pass
-                
+        self.job_index = JobIndex(self.previous_jobs)
+        self.seen_jobs = self.open_seen_jobs()
+        # Keys of the new postings found by the current run, which the early stop must not count as known
+        self.run_new_keys = set()
+        
+    def get_driver_path(self):
+        """Resolve chromedriver once per process, reusing the cached path while it matches Chrome."""
+        with self.driver_path_lock:
+            if self.driver_path is None:
+                started = time.time()
+                self.driver_path, cached = resolve_driver_path(self.config['driver_cache_file'])
+                source = 'cached' if cached else 'downloaded'
+                metrics.observe('driver_resolve', time.time() - started, source=source)
+                print(f"Resolved chromedriver in {time.time() - started:.2f}s ({source}): {self.driver_path}")
+        return self.driver_path
+        
+    def create_driver(self, slot=0):
+        """Start a Selenium WebDriver with enhanced stealth capabilities."""
         chrome_options = Options()
         
         # Enhanced stealth options
@@ -103,20 +266,41 @@ class LinkedInJobCrawler:
         chrome_options.add_argument("--accept-language=en-US,en;q=0.9")
         chrome_options.add_argument("--accept-encoding=gzip, deflate, br")
         
+        # A persistent profile per pool slot keeps the browser cache warm across process restarts
+        profile_dir = self.config['browser'].get('profile_dir')
+        if profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={os.path.join(profile_dir, f'browser-{slot}')}")
+        
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            service = Service(self.get_driver_path())
+            driver = webdriver.Chrome(service=service, options=chrome_options)
             
             # Execute stealth script to hide automation indicators
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {
                 "userAgent": user_agent
             })
             
         except Exception as e:
             print(f"Error setting up Chrome driver: {e}")
             print("Trying with direct ChromeDriver...")
-            self.driver = webdriver.Chrome(options=chrome_options)
+            driver = webdriver.Chrome(options=chrome_options)
+            
+        return driver
+            
+    def get_http_fetcher(self):
+        """Create the shared HTTP fetcher the first time an http search needs it."""
+        with self.http_fetcher_lock:
+            if self.http_fetcher is None:
+                http_config = self.config['http']
+                self.http_fetcher = HttpJobFetcher(
+                    self.config['user_agents'],
+                    rate_limiter=self.rate_limiter,
+                    max_pages=http_config.get('max_pages', 10),
+                    timeout_seconds=http_config.get('timeout_seconds', 15),
+                    max_connections=http_config.get('max_connections', 4)
+                )
+        return self.http_fetcher
             
     def human_like_delay(self, min_delay=None, max_delay=None):
         """Add human-like delay between actions."""
@@ -128,83 +312,215 @@ class LinkedInJobCrawler:
         delay = random.uniform(min_delay, max_delay)
         time.sleep(delay)
         
-    def human_like_scroll(self):
-        """Implement human-like scrolling behavior to load more jobs."""
-        if not self.driver:
-            return
-            
-        print("Starting enhanced scrolling to load all available jobs...")
-        scroll_attempts = 0
-        max_scroll_attempts = 15  # Increased to load more jobs
+    def read_scroll_state(self, driver):
+        """Return the page's card count, Show-more button state and the age of its last card."""
+        state = driver.execute_script(SCROLL_STATE_SCRIPT, CARD_SELECTOR_QUERY)
+        state['last_age'] = parse_posted_age(state.get('last_posted'))
+        return state
         
-        while scroll_attempts < max_scroll_attempts:
-            # Get current page height
-            current_height = self.driver.execute_script("return document.body.scrollHeight")
-            
-            # Scroll to bottom
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            
-            # Wait for new content to load
-            time.sleep(random.uniform(2.0, 4.0))
-            
-            # Check if "Show more jobs" button exists and click it
-            try:
-                show_more_button = self.driver.find_element(By.XPATH, "//button[contains(text(), 'Show more') or contains(text(), 'See more jobs')]")
-                if show_more_button.is_displayed() and show_more_button.is_enabled():
-                    self.driver.execute_script("arguments[0].click();", show_more_button)
-                    print("Clicked 'Show more jobs' button")
-                    time.sleep(random.uniform(3.0, 5.0))
-            except:
-                pass
+    def wait_for_more_cards(self, driver, before, timeout):
+        """Wait until the card count grows or the Show-more button changes state; return the new state."""
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+                lambda d: self.scroll_progress(d, before)
+            )
+        except TimeoutException:
+            return self.read_scroll_state(driver)
             
-            # Check if page height increased (new content loaded)
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
+    def scroll_progress(self, driver, before):
+        state = self.read_scroll_state(driver)
+        if state['cards'] > before['cards'] or state['button'] != before['button']:
+            return state
+        return False
+        
+    def human_like_scroll(self, driver, label='', on_round=None):
+        """Scroll and click Show more until no new cards load; see iter_scroll_rounds for the stop rules.
+        
+        on_round is called with the scroll state (card count, Show-more button state and the age of
+        the last card, as from read_scroll_state) before each round and once after the last;
+        returning True stops scrolling. Returns a report with the stop reason and the time spent in each phase.
+        """
+        report = {}
+        scroll_rounds = self.iter_scroll_rounds(driver, label, report)
+        for state in scroll_rounds:
+            if on_round is not None and on_round(state):
+                # Closing the generator stops the scroll and fills in the report
+                scroll_rounds.close()
+        return report or None
+        
+    def iter_scroll_rounds(self, driver, label='', report=None):
+        """Scroll and click Show more, yielding each new state once, waiting on page changes instead of fixed sleeps.
+        
+        Stops early at scroll['target_cards'], after scroll['time_budget_seconds'], once the last
+        loaded card is older than scroll['max_card_age_seconds'] (useful when sorted by date), or
+        when the caller stops iterating. The stop reason and the time spent in each phase are
+        written into report.
+        """
+        if not driver:
+            return
             
-            if new_height == current_height:
-                # No new content, try a few more times
-                scroll_attempts += 1
-                if scroll_attempts >= 3:
-                    # Try scrolling up and down to trigger loading
-                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.8);")
-                    time.sleep(1)
-                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(2)
+        prefix = f"[{label}] " if label else ""
+        scroll_config = self.config['scroll']
+        target_cards = scroll_config.get('target_cards')
+        time_budget = scroll_config.get('time_budget_seconds', 60)
+        max_card_age = scroll_config.get('max_card_age_seconds')
+        wait_timeout = scroll_config.get('wait_timeout_seconds', 8)
+        max_rounds = scroll_config.get('max_rounds', 15)
+        
+        started = time.monotonic()
+        phases = {'scroll': 0.0, 'show_more': 0.0, 'retrigger': 0.0}
+        state = self.read_scroll_state(driver)
+        initial_cards = state['cards']
+        stop_reason = 'max rounds'
+        rounds = 0
+        print(f"{prefix}Starting scroll with {initial_cards} cards loaded")
+        
+        try:
+            while rounds < max_rounds:
+                try:
+                    yield state
+                except GeneratorExit:
+                    # The caller stops once it reaches jobs it already has
+                    stop_reason = 'known jobs'
+                    raise
+                remaining = time_budget - (time.monotonic() - started)
+                if target_cards and state['cards'] >= target_cards:
+                    stop_reason = 'target card count'
+                    break
+                if remaining <= 0:
+                    stop_reason = 'time budget'
+                    break
+                if max_card_age is not None and state['last_age'] is not None and state['last_age'] > max_card_age:
+                    stop_reason = 'cards older than the window'
+                    break
+                rounds += 1
+                
+                # Click Show more when LinkedIn offers it, otherwise scroll to the bottom to trigger lazy loading
+                if state['button'] == 'visible':
+                    phase = 'show_more'
+                    driver.execute_script(CLICK_SHOW_MORE_SCRIPT)
+                else:
+                    phase = 'scroll'
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                phase_started = time.monotonic()
+                new_state = self.wait_for_more_cards(driver, state, min(wait_timeout, remaining))
+                
+                if new_state['cards'] == state['cards'] and new_state['button'] == state['button']:
+                    # Nothing loaded: nudge the infinite scroller once by scrolling up and back down
+                    phases[phase] += time.monotonic() - phase_started
+                    phase, phase_started = 'retrigger', time.monotonic()
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.8);")
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                    new_state = self.wait_for_more_cards(driver, state, min(wait_timeout, max(0.5, remaining)))
+                    if new_state['cards'] == state['cards'] and new_state['button'] == state['button']:
+                        phases[phase] += time.monotonic() - phase_started
+                        stop_reason = 'no new cards'
+                        break
+                phases[phase] += time.monotonic() - phase_started
+                state = new_state
+                print(f"{prefix}Scroll round {rounds}: {state['cards']} cards, Show more {state['button']}")
             else:
-                scroll_attempts = 0  # Reset counter if new content loaded
+                # Out of rounds: let the caller see the cards the last round loaded; every break
+                # happens after the current state was already yielded
+                yield state
+        finally:
+            metrics.observe('scroll', time.monotonic() - started)
+            for phase, seconds in phases.items():
+                metrics.observe('scroll_phase', seconds, phase=phase)
+            metrics.count('scroll_rounds', rounds)
+            metrics.count('scroll_stops', reason=stop_reason)
+            if report is None:
+                report = {}
+            report.update({
+                'rounds': rounds,
+                'cards': state['cards'],
+                'new_cards': state['cards'] - initial_cards,
+                'stop_reason': stop_reason,
+                'seconds': round(time.monotonic() - started, 2),
+                'phase_seconds': {phase: round(seconds, 2) for phase, seconds in phases.items()},
+            })
+            phase_summary = ', '.join(f"{phase} {seconds:.1f}s" for phase, seconds in report['phase_seconds'].items())
+            print(f"{prefix}Finished scrolling after {rounds} rounds ({stop_reason}): {state['cards']} cards "
+                  f"in {report['seconds']:.1f}s ({phase_summary})")
                 
-            print(f"Scroll attempt {scroll_attempts + 1}/{max_scroll_attempts}, Page height: {new_height}")
+    def iter_incremental(self, driver, label=''):
+        """Extract cards in the browser as each scroll round loads them, yielding their data and stopping after a run of stored jobs."""
+        prefix = f"[{label}] " if label else ""
+        stop_after = self.config['stop_after_known_jobs']
+        seen_urls = set()
+        known_run = 0
+        cards = 0
+        transferred = 0
+        
+        scroll_rounds = self.iter_scroll_rounds(driver, label)
+        for _ in scroll_rounds:
+            with metrics.timer('incremental_extract'):
+                batch = driver.execute_script(INCREMENTAL_EXTRACT_SCRIPT, *INCREMENTAL_EXTRACT_ARGS)
+            batch_bytes = len(json.dumps(batch))
+            transferred += batch_bytes
+            metrics.count('browser_transfer_bytes', batch_bytes)
+            metrics.count('cards_found', len(batch))
+            for item in batch:
+                # Cards repeated on the page share their job link; cards without one are kept
+                if item['view']:
+                    if item['view'] in seen_urls:
+                        continue
+                    seen_urls.add(item['view'])
+                job_data = item['job']
+                cards += 1
+                yield job_data
+                # Newest postings come first, so a run of stored ones means the rest were seen last run
+                known_run = known_run + 1 if job_data.get('url') and self.known_before_run(job_data) else 0
+            if stop_after and known_run >= stop_after:
+                scroll_rounds.close()
+        print(f"{prefix}Incremental extraction: {cards} cards, {transferred / 1024:.1f} KB from the browser")
+        
+    def scrape_incremental(self, driver, label=''):
+        """Extract cards in the browser as each scroll round loads them, stopping after a run of stored jobs."""
+        return list(self.iter_incremental(driver, label))
+        
+    def open_seen_jobs(self):
+        """Open the long-horizon seen-job store, or return None when it is turned off."""
+        seen_config = self.config['seen_jobs']
+        if not seen_config.get('horizon_days'):
+            return None
+        seen_jobs = SeenJobStore(
+            self.config['seen_jobs_dir'],
+            horizon_days=seen_config['horizon_days'],
+            bloom=seen_config.get('bloom', False),
+            expected_jobs_per_day=seen_config.get('expected_jobs_per_day', 5000),
+            false_positive_rate=seen_config.get('false_positive_rate', 0.001)
+        )
+        print(f"Seen-job store: {len(seen_jobs.partitions)} day(s), {len(seen_jobs)} entries")
+        return seen_jobs
         
-        print("Finished scrolling to load jobs")
-                
     def load_previous_jobs(self):
-        """Load previously scraped jobs from database file."""
-        if not os.path.exists(self.config['database_file']):
-            return []
+        """Load previously scraped jobs from the job store."""
         try:
-            with open(self.config['database_file'], 'r') as f:
-                return json.load(f)
+            return self.store.load_jobs()
         except Exception as e:
             print(f"Error loading previous jobs: {e}")
             return []
             
-    def save_jobs(self, jobs):
-        """Save jobs to the database file."""
+    def save_jobs(self, jobs, prune_before=None):
+        """Upsert jobs into the job store, dropping jobs scraped before prune_before."""
         try:
-            with open(self.config['database_file'], 'w') as f:
-                json.dump(jobs, f, indent=4)
-            print(f"Jobs saved to {self.config['database_file']}")
+            with metrics.timer('save'):
+                self.store.save_jobs(jobs, prune_before=prune_before)
+            metrics.count('jobs_saved', len(jobs))
+            print(f"Jobs saved to {self.store.path}")
         except Exception as e:
             print(f"Error saving jobs: {e}")
             
     def is_new_job(self, job):
-        """Check if a job is new by comparing with previous jobs."""
-        for prev_job in self.previous_jobs:
-            # Compare key fields to determine if it's the same job
-            if (job['title'] == prev_job['title'] and 
-                job['company'] == prev_job['company'] and
-                job['location'] == prev_job['location']):
-                return False
-        return True
+        """Check if a job is new by looking up its LinkedIn job id (or title/company/location hash)."""
+        if job in self.job_index:
+            return False
+        return self.seen_jobs is None or job not in self.seen_jobs
+        
+    def known_before_run(self, job):
+        """Check if a job was stored or seen before this run; postings this run has already found don't count."""
+        return job_key(job) not in self.run_new_keys and not self.is_new_job(job)
         
     def is_job_relevant(self, job_title):
         """Check if job title contains desired keywords and not excluded keywords."""
@@ -219,333 +535,427 @@ class LinkedInJobCrawler:
         return has_keyword and not has_excluded
         
     def extract_job_data_multiple_selectors(self, card):
-        """Try multiple selector strategies to extract job data."""
-        job_data = {}
-        
-        # Try multiple title selectors
-        title_selectors = [
-            'h3.base-search-card__title a',
-            'h3.base-search-card__title',
-            '.job-search-card__title a',
-            '.job-search-card__title',
-            'h3 a[data-tracking-control-name="public_jobs_jserp-result_search-card"]',
-            '.base-card__full-link',
-            'a[data-tracking-control-name="public_jobs_jserp-result_search-card"]',
-            '.job-search-card .job-search-card__title',
-            'h4.job-search-card__title',
-            'h3.job-search-card__title',
-            'a.job-search-card__title-link'
-        ]
-        
-        for selector in title_selectors:
-            try:
-                title_element = card.select_one(selector)
-                if title_element and title_element.get_text(strip=True):
-                    job_data['title'] = title_element.get_text(strip=True)
-                    # Also try to get URL from title link
-                    if title_element.get('href'):
-                        job_data['url'] = title_element['href']
-                    break
-            except:
-                continue
-                
-        # Try multiple company selectors
-        company_selectors = [
-            'h4.base-search-card__subtitle',
-            '.job-search-card__subtitle-link',
-            '.base-search-card__subtitle a',
-            'h4 a[data-tracking-control-name="public_jobs_jserp-result_job-search-card-subtitle"]',
-            '.job-search-card__subtitle',
-            'h4.job-search-card__subtitle',
-            '.base-search-card__subtitle',
-            'a[data-tracking-control-name="public_jobs_jserp-result_job-search-card-subtitle"]',
-            '.job-search-card .job-search-card__subtitle'
-        ]
-        
-        for selector in company_selectors:
-            try:
-                company_element = card.select_one(selector)
-                if company_element and company_element.get_text(strip=True):
-                    job_data['company'] = company_element.get_text(strip=True)
-                    break
-            except:
-                continue
-                
-        # Try multiple location selectors
-        location_selectors = [
-            'span.job-search-card__location',
-            '.base-search-card__metadata span',
-            '.job-search-card__location',
-            'span[data-tracking-control-name="public_jobs_jserp-result_job-search-card-location"]'
-        ]
-        
-        for selector in location_selectors:
-            try:
-                location_element = card.select_one(selector)
-                if location_element and location_element.get_text(strip=True):
-                    job_data['location'] = location_element.get_text(strip=True)
-                    break
-            except:
-                continue
-                
-        # Try multiple URL selectors if not already found
-        if 'url' not in job_data:
-            url_selectors = [
-                'a.base-card__full-link',
-                '.base-search-card__title a',
-                'h3 a',
-                'a[data-tracking-control-name="public_jobs_jserp-result_search-card"]',
-                'a[href*="/jobs/view/"]',
-                '.job-search-card__title a',
-                'a.job-search-card__title-link',
-                '.job-search-card a[href*="/jobs/view/"]',
-                'a[data-entity-urn*="jobPosting"]'
-            ]
+        """Try multiple selector strategies to extract job data from one card."""
+        return extract_job_data_multiple_selectors(card)
+        
+    def build_job(self, job_data, counts, prefix=''):
+        """Turn one card's extracted data into a job record, or return None for a masked, irrelevant or incomplete card."""
+        counts['cards'] += 1
+        # Skip if essential data is missing
+        if not job_data.get('title') or not job_data.get('company'):
+            counts['missing_data'] += 1
+            return None
             
-            for selector in url_selectors:
-                try:
-                    url_element = card.select_one(selector)
-                    if url_element and url_element.get('href'):
-                        job_data['url'] = url_element['href']
-                        break
-                except:
-                    continue
-                    
-        # Try multiple date selectors
-        date_selectors = [
-            'time.job-search-card__listdate',
-            'time',
-            '.job-search-card__listdate--new',
-            'span[data-tracking-control-name="public_jobs_jserp-result_job-search-card-date"]'
-        ]
-        
-        for selector in date_selectors:
+        title = job_data['title']
+        company = job_data['company']
+        
+        # Skip if data is masked with asterisks
+        if '*' in title or '*' in company:
+            print(f"{prefix}Skipping masked job data: {title} at {company}")
+            counts['masked'] += 1
+            return None
+            
+        if not self.is_job_relevant(title):
+            return None
+            
+        # Build complete job record
+        job = {
+            'title': title,
+            'company': company,
+            'location': job_data.get('location', 'Unknown Location'),
+            'date_posted': job_data.get('date_posted', 'Recent'),
+            'url': job_data.get('url', ''),
+            'source': 'LinkedIn',
+            'scraped_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        
+        # Only add if we have a valid URL
+        if not job['url']:
+            counts['no_url'] += 1
+            return None
+        counts['valid'] += 1
+        if counts['valid'] <= 5:  # Show first 5 jobs found
+            print(f"{prefix}Found valid job {counts['valid']}: {title} at {company}")
+        return job
+        
+    def report_extraction(self, counts, prefix=''):
+        """Print the extraction summary and add its tallies to the run metrics."""
+        metrics.count('jobs_extracted', counts['valid'])
+        for reason in ('masked', 'missing_data', 'no_url'):
+            metrics.count('cards_skipped', counts[reason], reason=reason)
+        print(f"\n{prefix}Extraction Summary:")
+        print(f"  Total cards processed: {counts['cards']}")
+        print(f"  Valid jobs extracted: {counts['valid']}")
+        print(f"  Skipped (masked data): {counts['masked']}")
+        print(f"  Skipped (missing data): {counts['missing_data']}")
+        print(f"  Skipped (no URL): {counts['no_url']}")
+        
+    def iter_built_jobs(self, job_datas, label=''):
+        """Turn extracted card data into job records as it arrives, skipping masked, irrelevant or incomplete cards."""
+        prefix = f"[{label}] " if label else ""
+        counts = dict.fromkeys(EXTRACTION_COUNTS, 0)
+        for i, job_data in enumerate(job_datas):
             try:
-                date_element = card.select_one(selector)
-                if date_element and date_element.get_text(strip=True):
-                    job_data['date_posted'] = date_element.get_text(strip=True)
-                    break
-            except:
+                job = self.build_job(job_data, counts, prefix)
+            except Exception as e:
+                print(f"{prefix}Error extracting job data from card {i}: {e}")
                 continue
-                
-        return job_data
-        
-    def scrape_linkedin_jobs(self):
-        """Scrape job data from LinkedIn with enhanced techniques."""
-        jobs = []
+            if job is not None:
+                yield job
+        self.report_extraction(counts, prefix)
+        
+    def build_jobs(self, job_datas, label=''):
+        """Turn extracted card data into job records, skipping masked, irrelevant or incomplete cards."""
+        return list(self.iter_built_jobs(job_datas, label))
+        
+    def iter_linkedin_jobs(self, job_url=None, label=''):
+        """Scrape one LinkedIn search page, yielding each job record as soon as its card is extracted."""
+        if job_url is None:
+            job_url = self.config['job_url']
+        prefix = f"[{label}] " if label else ""
+        yielded = set()
         max_retries = 3
         retry_count = 0
+        driver = None
+        pages_loaded = 0
         
-        while retry_count < max_retries:
-            try:
-                if self.driver is None:
-                    self.setup_driver()
-                
-                if not self.driver:
-                    raise Exception("Failed to initialize WebDriver")
-                    
-                print(f"Fetching LinkedIn jobs from: {self.config['job_url']}")
-                
-                # Navigate with human-like behavior
-                self.driver.get(self.config['job_url'])
-                
-                # Wait for initial page load
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-                
-                # Add human-like delay
-                self.human_like_delay(3, 6)
-                
-                # Try to accept cookies if present
+        try:
+            while retry_count < max_retries:
                 try:
-                    cookie_button = WebDriverWait(self.driver, 3).until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'Allow')]"))
-                    )
-                    cookie_button.click()
-                    self.human_like_delay(1, 2)
-                except:
-                    pass
-                
-                # Human-like scrolling to load more content
-                print("Scrolling to load more job listings...")
-                self.human_like_scroll()
-                
-                # Wait for content to load
-                self.human_like_delay(2, 4)
-                
-                # Get the page source after JavaScript execution
-                html = self.driver.page_source
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Try multiple selectors for job cards with more comprehensive search
-                job_card_selectors = [
-                    'div.base-card',
-                    '.job-search-card',
-                    '.base-search-card',
-                    'li[data-occludable-job-id]',
-                    '.jobs-search__results-list li',
-                    'div[data-entity-urn*="jobPosting"]',
-                    '.jobs-search-results__list-item',
-                    'div.job-search-card',
-                    'li.jobs-search-results__list-item'
-                ]
-                
-                job_cards = []
-                for selector in job_card_selectors:
-                    cards = soup.select(selector)
-                    if cards:
-                        print(f"Found {len(cards)} job cards using selector: {selector}")
-                        job_cards.extend(cards)
-                        # Don't break, collect from all working selectors
-                
-                # Remove duplicates by converting to set and back (based on HTML content)
-                unique_cards = []
-                seen_urls = set()
-                
-                for card in job_cards:
-                    # Try to find a unique identifier (URL) for deduplication
-                    url_elements = card.select('a[href*="/jobs/view/"]')
-                    if url_elements:
-                        url = url_elements[0].get('href', '')
-                        if url and url not in seen_urls:
-                            seen_urls.add(url)
-                            unique_cards.append(card)
-                    else:
-                        # If no URL found, still include the card
-                        unique_cards.append(card)
-                
-                job_cards = unique_cards
-                print(f"Total unique job cards after deduplication: {len(job_cards)}")
-                
-                if not job_cards:
-                    print("No job cards found with any selector")
-                    retry_count += 1
-                    continue
-                
-                # Process each job card
-                print(f"Processing {len(job_cards)} job cards...")
-                processed_count = 0
-                skipped_masked = 0
-                skipped_missing_data = 0
-                skipped_no_url = 0
-                
-                for i, card in enumerate(job_cards):
-                    try:
-                        job_data = self.extract_job_data_multiple_selectors(card)
+                    if driver is None:
+                        driver = self.driver_pool.acquire()
                         
-                        # Skip if essential data is missing
-                        if not job_data.get('title') or not job_data.get('company'):
-                            skipped_missing_data += 1
-                            continue
-                            
-                        title = job_data['title']
-                        company = job_data['company']
+                    print(f"{prefix}Fetching LinkedIn jobs from: {job_url}")
+                    
+                    # Navigate with human-like behavior, keeping all browsers under the per-host rate limit
+                    self.rate_limiter.wait(job_url)
+                    pages_loaded += 1
+                    with metrics.timer('navigate'):
+                        driver.get(job_url)
                         
-                        # Skip if data is masked with asterisks
-                        if '*' in title or '*' in company:
-                            print(f"Skipping masked job data: {title} at {company}")
-                            skipped_masked += 1
-                            continue
-                            
-                        if not self.is_job_relevant(title):
-                            continue
-                            
-                        # Build complete job record
-                        job = {
-                            'title': title,
-                            'company': company,
-                            'location': job_data.get('location', 'Unknown Location'),
-                            'date_posted': job_data.get('date_posted', 'Recent'),
-                            'url': job_data.get('url', ''),
-                            'source': 'LinkedIn',
-                            'scraped_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        }
+                        # Wait for initial page load
+                        WebDriverWait(driver, 10).until(
+                            EC.presence_of_element_located((By.TAG_NAME, "body"))
+                        )
+                    
+                    # Add human-like delay
+                    self.human_like_delay(3, 6)
+                    
+                    # Try to accept cookies if present
+                    try:
+                        cookie_button = WebDriverWait(driver, 3).until(
+                            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'Allow')]"))
+                        )
+                        cookie_button.click()
+                        self.human_like_delay(1, 2)
+                    except:
+                        pass
+                    
+                    # Human-like scrolling to load more content
+                    print(f"{prefix}Scrolling to load more job listings...")
+                    if self.config['browser_extraction'] == 'incremental':
+                        # Cards are extracted and yielded round by round while the page keeps scrolling
+                        job_datas = self.iter_incremental(driver, label)
+                    else:
+                        self.human_like_scroll(driver, label)
                         
-                        # Only add if we have a valid URL
-                        if job['url']:
-                            jobs.append(job)
-                            processed_count += 1
-                            if processed_count <= 5:  # Show first 5 jobs found
-                                print(f"Found valid job {processed_count}: {title} at {company}")
-                        else:
-                            skipped_no_url += 1
+                        # Get the page source after JavaScript execution and extract every
+                        # unique card in a single pass over the parsed tree
+                        with metrics.timer('page_source'):
+                            html = driver.page_source
+                        job_datas = self.extraction_pool.extract(html)
+                        print(f"{prefix}Total unique job cards after deduplication: {len(job_datas)}")
+                        if not job_datas:
+                            print(f"{prefix}No job cards found with any selector")
+                            retry_count += 1
+                            continue
+                    
+                    # A retry after a failure part way through the page skips the jobs already yielded
+                    for job in self.iter_built_jobs(job_datas, label):
+                        key = job_key(job)
+                        if key not in yielded:
+                            yielded.add(key)
+                            yield job
+                    
+                    # If we got some valid jobs, break the retry loop
+                    if yielded:
+                        break
                         
-                    except Exception as e:
-                        print(f"Error extracting job data from card {i}: {e}")
-                        continue
+                    retry_count += 1
+                    if retry_count < max_retries:
+                        print(f"{prefix}Retry {retry_count}/{max_retries} - No valid jobs found, retrying...")
+                        self.human_like_delay(5, 10)
+                    
+                except Exception as e:
+                    print(f"{prefix}Error scraping LinkedIn (attempt {retry_count + 1}): {e}")
+                    retry_count += 1
+                    
+                    # Keep a browser that still responds; only a dead one is replaced by a fresh start
+                    if driver is not None and not driver_is_alive(driver):
+                        self.driver_pool.discard(driver)
+                        driver = None
+                        pages_loaded = 0
+                    
+                    if retry_count < max_retries:
+                        self.human_like_delay(10, 15)
+        finally:
+            if driver is not None:
+                self.driver_pool.release(driver, pages=pages_loaded)
                 
-                print(f"\nExtraction Summary:")
-                print(f"  Total cards processed: {len(job_cards)}")
-                print(f"  Valid jobs extracted: {processed_count}")
-                print(f"  Skipped (masked data): {skipped_masked}")
-                print(f"  Skipped (missing data): {skipped_missing_data}")
-                print(f"  Skipped (no URL): {skipped_no_url}")
+    def scrape_linkedin_jobs(self, job_url=None, label=''):
+        """Scrape job data from one LinkedIn search page with enhanced techniques."""
+        return list(self.iter_linkedin_jobs(job_url, label))
+        
+    def iter_linkedin_jobs_http(self, job_url=None, label=''):
+        """Page through server-rendered LinkedIn results without a browser, yielding each page's job records as it arrives."""
+        if job_url is None:
+            job_url = self.config['job_url']
+        prefix = f"[{label}] " if label else ""
+        fetcher = self.get_http_fetcher()
+        seen_keys = set()
+        
+        def iter_card_datas():
+            for start, html in fetcher.iter_pages(job_url):
+                # Concurrent searches each hand their pages to the extraction workers
+                page_datas = self.extraction_pool.extract(html)
+                fresh = []
+                for job_data in page_datas:
+                    key = job_key(job_data)
+                    if key not in seen_keys:
+                        seen_keys.add(key)
+                        fresh.append(job_data)
+                print(f"{prefix}Page start={start}: {len(page_datas)} cards, {len(fresh)} new")
+                metrics.count('cards_repeated', len(page_datas) - len(fresh), mode='http')
                 
-                # If we got some valid jobs, break the retry loop
-                if jobs:
+                # Past the last page LinkedIn returns no cards or repeats earlier ones
+                if not fresh:
                     break
-                    
-                retry_count += 1
-                if retry_count < max_retries:
-                    print(f"Retry {retry_count}/{max_retries} - No valid jobs found, retrying...")
-                    self.human_like_delay(5, 10)
-                
-            except Exception as e:
-                print(f"Error scraping LinkedIn (attempt {retry_count + 1}): {e}")
-                retry_count += 1
+                yield from fresh
                 
-                # Try to restart the driver if it failed
+        yield from self.iter_built_jobs(iter_card_datas(), label)
+            
+    def fetch_linkedin_jobs_http(self, job_url=None, label=''):
+        """Fetch job data by paging through server-rendered LinkedIn results without a browser."""
+        return list(self.iter_linkedin_jobs_http(job_url, label))
+        
+    def fetch_linkedin_jobs_async(self, searches, on_job=None):
+        """Fetch several searches through the asyncio pipeline and return each one's jobs.
+        
+        on_job, if given, is called with (search position, job) as soon as each page's jobs are built,
+        and the jobs are not kept, so every search's list comes back empty.
+        """
+        http_config = self.config['http']
+        pipeline = AsyncJobPipeline(
+            self.config['user_agents'],
+            parser_engine=self.config['parser_engine'],
+            max_pages=http_config.get('max_pages', 10),
+            max_connections=http_config.get('max_connections', 4),
+            pages_in_flight=http_config.get('pages_in_flight', 2),
+            requests_per_second=http_config.get('requests_per_second', 1.0),
+            burst=http_config.get('burst', 2),
+            queue_size=http_config.get('queue_size', 8),
+            # Enough parse stages to keep every extraction worker busy
+            parse_workers=max(http_config.get('parse_workers', 2), self.extraction_pool.workers),
+            max_retries=http_config.get('max_retries', 4),
+            timeout_seconds=http_config.get('timeout_seconds', 15),
+            extraction_pool=self.extraction_pool
+        )
+        results = [[] for _ in searches]
+        counts = [dict.fromkeys(EXTRACTION_COUNTS, 0) for _ in searches]
+        
+        # Build job records page by page on the pipeline's event loop instead of after the whole crawl
+        def build_page(position, job_datas):
+            prefix = f"[{searches[position]['name']}] "
+            for job_data in job_datas:
                 try:
-                    if self.driver:
-                        self.driver.quit()
-                except:
-                    pass
-                self.driver = None
-                
-                if retry_count < max_retries:
-                    self.human_like_delay(10, 15)
-                    
-        return jobs
+                    job = self.build_job(job_data, counts[position], prefix)
+                except Exception as e:
+                    print(f"{prefix}Error extracting job data from card: {e}")
+                    continue
+                if job is None:
+                    continue
+                if on_job is None:
+                    results[position].append(job)
+                else:
+                    on_job(position, job)
+                        
+        pipeline.run(searches, on_page=build_page)
+        for search, search_counts in zip(searches, counts):
+            self.report_extraction(search_counts, f"[{search['name']}] ")
+        return results
+        
+    def fetch_mode(self, search):
+        """Return the fetch mode for a search, falling back to http when aiohttp is missing."""
+        fetch_mode = search.get('fetch_mode', self.config['fetch_mode'])
+        if fetch_mode == 'async' and not AIOHTTP_AVAILABLE:
+            print(f"[{search['name']}] aiohttp is not installed, using the http fetch mode")
+            return 'http'
+        return fetch_mode
+        
+    def iter_search(self, search):
+        """Crawl one expanded search with its fetch mode, yielding job records as they are extracted."""
+        fetch_mode = self.fetch_mode(search)
+        if fetch_mode == 'http':
+            return self.iter_linkedin_jobs_http(search['url'], search['name'])
+        if fetch_mode != 'browser':
+            raise ValueError(f"Unknown fetch_mode {fetch_mode!r}; expected 'browser', 'http' or 'async'")
+        return self.iter_linkedin_jobs(search['url'], search['name'])
+        
+    def scrape_search(self, search):
+        """Crawl one expanded search with its fetch mode."""
+        return list(self.iter_search(search))
+        
+    def iter_search_results(self, searches=None):
+        """Crawl every configured search concurrently, yielding (search index, job) as soon as any search extracts a job."""
+        if searches is None:
+            searches = expand_searches(self.config)
+        if not searches:
+            return
+        # Browser searches are capped by the driver pool; http searches only need a thread
+        workers = min(max(self.driver_pool.size, self.config['http'].get('max_connections', 4)), len(searches))
+        started = time.time()
         
-    def run_once(self):
-        """Run the LinkedIn job crawler once."""
-        print(f"Starting LinkedIn job scraping at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"Looking for jobs posted in the last 24 hours matching 'data engineer'")
+        # Async searches share one pipeline on a single thread; the rest get a thread each
+        async_indexes = [i for i, search in enumerate(searches) if self.fetch_mode(search) == 'async']
+        other_indexes = [i for i in range(len(searches)) if i not in async_indexes]
         
-        # Scrape LinkedIn jobs
-        current_jobs = self.scrape_linkedin_jobs()
+        # Search threads hand each job to this generator as soon as it is built; None marks a finished task
+        results = queue.Queue()
         
-        # Identify new jobs
-        new_jobs = []
-        for job in current_jobs:
-            if self.is_new_job(job):
+        def crawl(indexes, batched):
+            counts = dict.fromkeys(indexes, 0)
+            
+            def emit(i, job):
+                counts[i] += 1
+                results.put((i, job))
+                
+            try:
+                if batched:
+                    self.fetch_linkedin_jobs_async([searches[i] for i in indexes],
+                                                   on_job=lambda position, job: emit(indexes[position], job))
+                else:
+                    for job in self.iter_search(searches[indexes[0]]):
+                        emit(indexes[0], job)
+            except Exception as e:
+                print(f"[{', '.join(searches[i]['name'] for i in indexes)}] Search failed: {e}")
+            finally:
+                for i in indexes:
+                    print(f"[{searches[i]['name']}] {counts[i]} jobs")
+                results.put(None)
+        
+        print(f"Crawling {len(searches)} searches on {workers} threads (up to {self.driver_pool.size} browsers)")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='search') as executor:
+            tasks = [executor.submit(crawl, [i], False) for i in other_indexes]
+            if async_indexes:
+                tasks.append(executor.submit(crawl, async_indexes, True))
+            pending = len(tasks)
+            while pending:
+                item = results.get()
+                if item is None:
+                    pending -= 1
+                else:
+                    yield item
+        
+        print(f"Finished {len(searches)} searches in {time.time() - started:.1f}s")
+        
+    def scrape_searches(self, searches=None):
+        """Crawl every configured search concurrently and return their jobs in search order."""
+        if searches is None:
+            searches = expand_searches(self.config)
+        results = [[] for _ in searches]
+        for i, job in self.iter_search_results(searches):
+            results[i].append(job)
+        # Duplicates across searches are dropped by the single dedup step in iter_new_jobs
+        return [job for jobs in results for job in jobs]
+        
+    def iter_new_jobs(self):
+        """Crawl every search, yielding each posting not seen before as soon as it is extracted, without saving it yet."""
+        print(f"Starting LinkedIn job scraping at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        searches = expand_searches(self.config)
+        print(f"Looking for jobs matching: {', '.join(search['name'] for search in searches)}")
+        
+        # Identify new jobs as the searches find them, dropping postings that several searches returned
+        startups_before = len(self.driver_pool.startup_seconds)
+        total_jobs = 0
+        new_count = 0
+        self.run_new_keys = set()
+        for _, job in self.iter_search_results(searches):
+            total_jobs += 1
+            with metrics.timer('is_new_job'):
+                is_new = self.is_new_job(job)
+            if is_new:
+                # Recorded before the job is indexed, so the crawl threads' early stop never sees it as known
+                self.run_new_keys.add(job_key(job))
+            # Every listing, new or not, moves to today's partition, so the horizon counts from the last sighting
+            if self.seen_jobs is not None:
+                self.seen_jobs.add(job)
+            if is_new:
                 job['email_sent'] = False
-                new_jobs.append(job)
-        
-        # Keep jobs from the last hour and add new jobs
+                # Index right away so the same posting seen twice in one scrape is only added once
+                self.job_index.add(job)
+                new_count += 1
+                yield job
+        
+        # Browser startup cost of this run; zero browsers started means warm ones were reused
+        startups = self.driver_pool.startup_seconds[startups_before:]
+        if startups:
+            print(f"Started {len(startups)} browser(s) in {sum(startups):.1f}s "
+                  f"({sum(startups) / len(startups):.1f}s average)")
+        if not self.config['browser'].get('warm_between_runs', True):
+            self.driver_pool.close()
+        
+        metrics.count('jobs_seen', total_jobs)
+        metrics.count('jobs_new', new_count)
+        print(f"\nFound {total_jobs} total job listings")
+        print(f"Identified {new_count} new job postings")
+        
+    def collect_new_jobs(self):
+        """Crawl every search and return the postings not seen before, without saving them yet."""
+        return list(self.iter_new_jobs())
+        
+    def save_run(self, new_jobs, unsaved_jobs=None):
+        """Save a run's new jobs, dropping stored jobs older than an hour.
+        
+        When some of new_jobs were already written part way through the run, pass the rest as unsaved_jobs.
+        """
+        # Keep jobs from the last hour and add new jobs; older ones are still known to the seen-job store.
+        # scraped_date strings sort chronologically, so they are compared without parsing each one
         one_hour_ago = datetime.now() - timedelta(hours=1)
-        filtered_previous_jobs = [
-            job for job in self.previous_jobs 
-            if datetime.strptime(job['scraped_date'], '%Y-%m-%d %H:%M:%S') >= one_hour_ago
-        ]
+        cutoff = one_hour_ago.strftime('%Y-%m-%d %H:%M:%S')
+        filtered_previous_jobs = [job for job in self.previous_jobs if job['scraped_date'] >= cutoff]
         all_jobs = filtered_previous_jobs + new_jobs
-        self.save_jobs(all_jobs)
+        self.save_jobs(new_jobs if unsaved_jobs is None else unsaved_jobs, prune_before=one_hour_ago)
+        if self.seen_jobs is not None:
+            with metrics.timer('save_seen_jobs'):
+                self.seen_jobs.save()
         
-        print(f"\nFound {len(current_jobs)} total job listings")
-        print(f"Identified {len(new_jobs)} new job postings")
+        # Keep the in-memory state in step with what was saved for the next run
+        self.previous_jobs = all_jobs
+        self.job_index = JobIndex(all_jobs)
         
+    def run_once(self):
+        """Run the LinkedIn job crawler once."""
+        metrics.reset()
+        with profile_run(self.config['metrics'].get('profile'), self.config['metrics_dir'], 'crawler'):
+            new_jobs = self.collect_new_jobs()
+            self.save_run(new_jobs)
+        self.write_metrics('crawler')
         return new_jobs
         
+    def write_metrics(self, job):
+        """Write the run report and Prometheus textfile for job, unless metrics are disabled."""
+        if self.config['metrics'].get('enabled', True):
+            write_run_metrics(job, self.config['metrics_dir'])
+        
     def cleanup(self):
         """Clean up resources."""
-        if self.driver:
-            try:
-                self.driver.quit()
-                print("Browser closed successfully")
-            except:
-                pass
-            self.driver = None
+        self.store.close()
+        if self.http_fetcher is not None:
+            self.http_fetcher.close()
+        self.extraction_pool.close()
+        closed = self.driver_pool.close()
+        if closed:
+            print(f"Closed {closed} browser(s)")
 
 
 # Run the LinkedIn crawler once
@@ -0,0 +1,112 @@
+import json
+import os
+import re
+from collections import OrderedDict
+
+
+def normalize_company(company_name):
+    """Normalize a company name into a cache key (case and whitespace insensitive)."""
+    return re.sub(r'\s+', ' ', str(company_name)).strip().lower()
+
+
+class MatchCache:
+    def __init__(self, cache_file, index_version, max_entries=10000):
+        """Load the persistent company -> employer match cache for one employer index version."""
+        self.cache_file = cache_file
+        self.index_version = index_version
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # Least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Load cached matches, discarding them if they were built against another index."""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                cached = json.load(f)
+        except Exception as e:
+            print(f"Error loading match cache: {e}")
+            return
+
+        if cached.get('index_version') != self.index_version:
+            print("Employer index changed, invalidating match cache")
+            return
+        for key, entry in cached.get('entries', []):
+            self.entries[key] = entry
+        self._evict()
+
+    def save(self):
+        """Write the cache to disk in LRU order."""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            tmp_file = self.cache_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump({'index_version': self.index_version, 'entries': list(self.entries.items())}, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"Error saving match cache: {e}")
+
+    def get(self, company_name):
+        """Return the cached entry for a company, or None on a miss."""
+        key = normalize_company(company_name)
+        entry = self.entries.get(key)
+        if entry is None or entry.get('index_version') != self.index_version:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, company_name, match):
+        """Store a match result; match is (employer, score) or None for no match."""
+        employer, score = match if match is not None else (None, None)
+        key = normalize_company(company_name)
+        self.entries[key] = {'employer': employer, 'score': score, 'index_version': self.index_version}
+        self.entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries beyond max_entries."""
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def cached_match_batch(employer_index, company_names, match_cache, chunk_size=1024):
+    """Match companies through the cache, scoring only distinct uncached names against the index."""
+    results = [None] * len(company_names)
+    to_score = OrderedDict()  # normalized name -> (raw name, positions waiting on it)
+
+    for position, company_name in enumerate(company_names):
+        key = normalize_company(company_name)
+        if key in to_score:
+            # Already queued this run; a later occurrence counts as a hit
+            to_score[key][1].append(position)
+            match_cache.hits += 1
+            continue
+
+        entry = match_cache.get(company_name)
+        if entry is not None:
+            if entry['employer'] is not None:
+                results[position] = (entry['employer'], entry['score'])
+        else:
+            to_score[key] = (company_name, [position])
+
+    if to_score:
+        pending = list(to_score.values())
+        matches = employer_index.match_batch([company_name for company_name, _ in pending], chunk_size=chunk_size)
+        for (company_name, positions), match in zip(pending, matches):
+            if match is not None:
+                match = (str(match[0]), float(match[1]))
+            match_cache.put(company_name, match)
+            for position in positions:
+                results[position] = match
+
+    return results
@@ -0,0 +1,205 @@
+"""Per-stage timers and counters for a crawl/match run, exported as a JSON run report and a Prometheus textfile.
+
+Modules record into the shared `metrics` object:
+
+    with metrics.timer('navigate'):
+        driver.get(url)
+    metrics.count('selector_hits', field='title', selector='h3.base-search-card__title')
+
+and an entry point brackets a run with metrics.reset() and write_run_metrics(job, metrics_dir),
+which writes <job>.json and <job>.prom for node_exporter's textfile collector. profile_run()
+optionally wraps a run in cProfile and/or tracemalloc and dumps the results next to them.
+"""
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+
+METRIC_NAMESPACE = 'jobcrawler'
+PROFILE_MODES = ('cpu', 'memory', 'both')
+
+_INVALID_METRIC_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape_label_value(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + '}'
+
+
+def _write_atomic(path, text):
+    """Write through a temporary file so a collector never reads a half-written file."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+class RunMetrics:
+    """Stage timers and labelled counters for one run; safe to update from several threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new run, dropping everything recorded so far."""
+        with self.lock:
+            self.started = time.time()
+            self.timers = {}  # (stage, labels) -> [calls, total seconds, max seconds]
+            self.counters = {}  # (name, labels) -> value
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """Time the enclosed block as one call of stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, **labels)
+
+    def observe(self, stage, seconds, **labels):
+        """Record one call of stage that took seconds."""
+        key = (stage, _label_key(labels))
+        with self.lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                self.timers[key] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    def count(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def count_labelled(self, name, counts, *label_names):
+        """Add a {label value(s): count} mapping, e.g. per-selector hits collected over a page, in one call."""
+        with self.lock:
+            for values, value in counts.items():
+                if not isinstance(values, tuple):
+                    values = (values,)
+                key = (name, _label_key(dict(zip(label_names, values))))
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def report(self):
+        """Return the run so far as a JSON-serialisable dict."""
+        with self.lock:
+            finished = time.time()
+            stages = [{'stage': stage, 'labels': dict(labels), 'calls': calls,
+                       'seconds': round(total, 6), 'max_seconds': round(longest, 6)}
+                      for (stage, labels), (calls, total, longest) in sorted(self.timers.items())]
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+        return {
+            'started': datetime.fromtimestamp(self.started).strftime('%Y-%m-%d %H:%M:%S'),
+            'seconds': round(finished - self.started, 3),
+            'stages': stages,
+            'counters': counters,
+        }
+
+    def prometheus_text(self, job):
+        """Render the run in the Prometheus text exposition format, every series labelled with job."""
+        report = self.report()
+        job_label = (('job_name', job),)
+        lines = []
+
+        def family(name, help_text, samples):
+            metric = f"{METRIC_NAMESPACE}_{_INVALID_METRIC_CHARS.sub('_', name)}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, value in samples:
+                lines.append(f"{metric}{_format_labels(job_label + tuple(sorted(labels.items())))} {value}")
+
+        family('run_start_timestamp_seconds', "Unix time the last run started.", [({}, round(self.started, 3))])
+        family('run_duration_seconds', "Wall-clock length of the last run.", [({}, report['seconds'])])
+        stage_samples = [(dict(entry['labels'], stage=entry['stage']), entry) for entry in report['stages']]
+        family('stage_seconds', "Time spent in each stage during the last run.",
+               [(labels, entry['seconds']) for labels, entry in stage_samples])
+        family('stage_calls', "Times each stage ran during the last run.",
+               [(labels, entry['calls']) for labels, entry in stage_samples])
+        family('stage_max_seconds', "Longest single call of each stage during the last run.",
+               [(labels, entry['max_seconds']) for labels, entry in stage_samples])
+
+        by_name = {}
+        for entry in report['counters']:
+            by_name.setdefault(entry['name'], []).append((entry['labels'], entry['value']))
+        for name, samples in by_name.items():
+            family(name, f"{name.replace('_', ' ').capitalize()} during the last run.", samples)
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, path):
+        _write_atomic(path, json.dumps(self.report(), indent=4))
+
+    def write_prometheus(self, path, job):
+        _write_atomic(path, self.prometheus_text(job))
+
+
+metrics = RunMetrics()
+
+
+def write_run_metrics(job, metrics_dir):
+    """Write the shared metrics as <job>.json and <job>.prom in metrics_dir."""
+    try:
+        metrics.write_report(os.path.join(metrics_dir, f"{job}.json"))
+        metrics.write_prometheus(os.path.join(metrics_dir, f"{job}.prom"), job)
+        print(f"Run metrics written to {metrics_dir}")
+    except OSError as e:
+        print(f"Error writing run metrics: {e}")
+
+
+@contextmanager
+def profile_run(mode, output_dir, job='run'):
+    """Profile the enclosed run with cProfile ('cpu'), tracemalloc ('memory') or both, and dump the results.
+
+    Writes <job>.prof (open with snakeviz or pstats) and <job>.cpu.txt / <job>.memory.txt summaries.
+    A mode of None profiles nothing.
+    """
+    if not mode:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {mode!r}; expected one of {', '.join(PROFILE_MODES)}")
+
+    profiler = cProfile.Profile() if mode in ('cpu', 'both') else None
+    trace_memory = mode in ('memory', 'both') and not tracemalloc.is_tracing()
+    if trace_memory:
+        tracemalloc.start(25)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        os.makedirs(output_dir, exist_ok=True)
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(output_dir, f"{job}.prof"))
+            with open(os.path.join(output_dir, f"{job}.cpu.txt"), 'w') as f:
+                pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(50)
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(os.path.join(output_dir, f"{job}.memory.txt"), 'w') as f:
+                f.write(f"current {current / (1024 * 1024):.1f} MB, peak {peak / (1024 * 1024):.1f} MB\n\n")
+                for stat in snapshot.statistics('lineno')[:50]:
+                    f.write(f"{stat}\n")
+        print(f"Profile ({mode}) written to {output_dir}")
@@ -0,0 +1,370 @@
+"""Pooled SMTP notifier: per-recipient match digests sent over reused, authenticated connections.
+
+A Notifier keeps up to `concurrency` logged-in SMTP connections open and sends every digest of a
+batch over them, instead of connecting, STARTTLS-ing and logging in once per message. Transient
+failures (dropped connections, 4xx replies) are retried on a fresh connection with backoff, and a
+recipient whose digest still fails gets those matches again with the next batch, even in a later
+run, since the digests still owed are kept in undelivered_file.
+
+Recipients are RECIPIENT_EMAIL, who gets every match, plus each employee_email in sendmail.csv,
+who gets the matches at the company on their row (or every match when the row has no company).
+Settings come from the environment, so the notifier can be pointed at a local stand-in:
+
+    python -m aiosmtpd -n -l 127.0.0.1:8025
+    SMTP_HOST=127.0.0.1 SMTP_PORT=8025 SMTP_STARTTLS=0 SENDER_EMAIL=me@example.com python tfidf_matcher.py
+"""
+import csv
+import json
+import os
+import queue
+import random
+import smtplib
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from html import escape
+
+from employer_index import normalize_employer
+from metrics import metrics
+
+
+recipients_file_path = os.path.join(os.path.dirname(__file__), 'sendmail.csv')
+undelivered_file_path = os.path.join(os.path.dirname(__file__), 'data', 'undelivered.json')
+
+DIGEST_HEAD = """<html>
+  <head></head>
+  <body>
+    <h2>Job Opportunities at H-1B Sponsoring Companies</h2>
+    <p>We found {count} jobs at companies known to sponsor H-1B visas:</p>
+    <table border="1" cellpadding="5">
+      <tr>
+        <th>Company</th>
+        <th>Matched Company</th>
+        <th>Job Title</th>
+        <th>Match Score</th>
+        <th>Petitions</th>
+        <th>Link</th>
+      </tr>
+"""
+DIGEST_ROW = """      <tr>
+        <td>{company}</td>
+        <td>{matched_company}</td>
+        <td>{title}</td>
+        <td>{match_score:.2f}</td>
+        <td>{petitions}</td>
+        <td><a href="{url}">View Job</a></td>
+      </tr>
+"""
+DIGEST_TAIL = """    </table>
+    <p>Date found: {found}</p>
+  </body>
+</html>
+"""
+
+# Connection problems worth retrying on a fresh connection; SMTP replies are judged by their code
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, socket.timeout)
+
+
+def render_digest(matching_jobs, found=None):
+    """Yield the digest's HTML piece by piece, one table row per job."""
+    yield DIGEST_HEAD.format(count=len(matching_jobs))
+    for job in matching_jobs:
+        yield DIGEST_ROW.format(
+            company=escape(str(job['company'])),
+            matched_company=escape(str(job['matched_company'])),
+            title=escape(str(job['title'])),
+            match_score=job['match_score'],
+            petitions=job.get('petitions', ''),
+            url=escape(str(job['url'])),
+        )
+    yield DIGEST_TAIL.format(found=found or datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+
+def build_digest(sender_email, recipient_email, matching_jobs):
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = f"Job Match Alert: {len(matching_jobs)} H-1B Sponsoring Companies"
+    msg['From'] = sender_email
+    msg['To'] = recipient_email
+    msg.attach(MIMEText(''.join(render_digest(matching_jobs)), 'html'))
+    return msg
+
+
+def load_recipients(file_path=recipients_file_path):
+    """Read {email: set of normalized companies} from the contacts sheet; an empty set means every company."""
+    recipients = {}
+    everything = set()  # Contacts with a row that names no company
+    if not os.path.exists(file_path):
+        return recipients
+    try:
+        with open(file_path, 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                email = (row.get('employee_email') or '').strip()
+                if not email:
+                    continue
+                company = normalize_employer(row.get('company') or '')
+                recipients.setdefault(email, set())
+                if company:
+                    recipients[email].add(company)
+                else:
+                    everything.add(email)
+    except (OSError, csv.Error) as e:
+        print(f"Error reading recipients from {file_path}: {e}")
+    return {email: set() if email in everything else companies for email, companies in recipients.items()}
+
+
+def plan_digests(matching_jobs, primary_recipient=None, recipients=None):
+    """Return [(recipient, jobs)]: every match for primary_recipient, each contact's company's matches for them."""
+    digests = {}
+    if primary_recipient:
+        digests[primary_recipient] = list(matching_jobs)
+    for email, companies in (recipients or {}).items():
+        if email in digests:
+            continue
+        if companies:
+            jobs = [job for job in matching_jobs
+                    if normalize_employer(job['company']) in companies
+                    or normalize_employer(job['matched_company']) in companies]
+        else:
+            jobs = list(matching_jobs)
+        if jobs:
+            digests[email] = jobs
+    return list(digests.items())
+
+
+def digest_job(job):
+    """Return the fields of a match that its digest row shows, as plain JSON types."""
+    return {
+        'title': str(job['title']),
+        'company': str(job['company']),
+        'matched_company': str(job['matched_company']),
+        'match_score': float(job['match_score']),
+        'petitions': job.get('petitions', ''),
+        'url': str(job['url']),
+    }
+
+
+def merge_jobs(earlier_jobs, jobs):
+    """Return earlier_jobs followed by the jobs not already among them, by job URL."""
+    urls = {job['url'] for job in earlier_jobs}
+    return list(earlier_jobs) + [job for job in jobs if job['url'] not in urls]
+
+
+class SmtpConnectionPool:
+    """Up to `size` logged-in SMTP connections, handed out to one sender at a time and reused."""
+
+    def __init__(self, host, port, username=None, password=None, starttls=True, size=2, timeout=30,
+                 max_idle_seconds=60):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        # Servers hang up on idle clients (Gmail after a few minutes), so older connections are replaced
+        self.max_idle_seconds = max_idle_seconds
+        self.idle = queue.LifoQueue()  # (connection, time it was returned)
+        # Caps open connections, idle or in use, at size
+        self.slots = threading.BoundedSemaphore(size)
+
+    def connect(self):
+        with metrics.timer('smtp_connect'):
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.starttls:
+                    server.starttls()
+                if self.password:
+                    server.login(self.username, self.password)
+            except Exception:
+                server.close()
+                raise
+        return server
+
+    @contextmanager
+    def connection(self):
+        """Lend a connection, reusing an idle one; it is dropped rather than returned if the block raises."""
+        self.slots.acquire()
+        try:
+            server, returned = self.idle.get_nowait()
+            if time.monotonic() - returned > self.max_idle_seconds:
+                self.discard(server)
+                server = None
+        except queue.Empty:
+            server = None
+        try:
+            if server is None:
+                server = self.connect()
+            yield server
+        except BaseException:
+            if server is not None:
+                self.discard(server)
+            self.slots.release()
+            raise
+        self.idle.put((server, time.monotonic()))
+        self.slots.release()
+
+    @staticmethod
+    def discard(server):
+        try:
+            server.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """QUIT every idle connection."""
+        while True:
+            try:
+                server, _ = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                server.quit()
+            except Exception:
+                self.discard(server)
+
+
+class Notifier:
+    """Send match digests over a shared connection pool, several recipients at once."""
+
+    def __init__(self, sender_email, sender_password=None, host='smtp.gmail.com', port=587, starttls=True,
+                 concurrency=2, max_retries=3, recipients_file=recipients_file_path, max_undelivered_batches=5,
+                 undelivered_file=undelivered_file_path):
+        self.sender_email = sender_email
+        self.recipients_file = recipients_file
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        # recipient -> (jobs, failed batches) for digests that failed after other recipients got theirs,
+        # kept in undelivered_file so a later run still sends them
+        self.undelivered_file = undelivered_file
+        self.undelivered = self.load_undelivered()
+        self.max_undelivered_batches = max_undelivered_batches
+        self.pool = SmtpConnectionPool(host, port, sender_email, sender_password, starttls, self.concurrency)
+
+    @classmethod
+    def from_env(cls):
+        """Configure from SENDER_EMAIL/SENDER_PASSWORD and the optional SMTP_* settings."""
+        return cls(
+            os.environ.get("SENDER_EMAIL"),
+            os.environ.get("SENDER_PASSWORD"),
+            host=os.environ.get("SMTP_HOST", "smtp.gmail.com"),
+            port=int(os.environ.get("SMTP_PORT", 587)),
+            starttls=os.environ.get("SMTP_STARTTLS", "1") != "0",
+            concurrency=int(os.environ.get("SMTP_CONCURRENCY", 2)),
+            max_retries=int(os.environ.get("SMTP_MAX_RETRIES", 3)),
+            recipients_file=os.environ.get("RECIPIENTS_FILE", recipients_file_path),
+            undelivered_file=os.environ.get("UNDELIVERED_FILE", undelivered_file_path),
+        )
+
+    def load_undelivered(self):
+        """Read the digests still owed from undelivered_file."""
+        if not self.undelivered_file or not os.path.exists(self.undelivered_file):
+            return {}
+        try:
+            with open(self.undelivered_file, 'r') as f:
+                owed = json.load(f)
+        except Exception as e:
+            print(f"Error loading undelivered digests: {e}")
+            return {}
+        return {recipient: (entry['jobs'], entry['failures']) for recipient, entry in owed.items()}
+
+    def save_undelivered(self):
+        """Write the digests still owed to undelivered_file; returns whether they were written."""
+        if not self.undelivered_file:
+            return not self.undelivered
+        try:
+            os.makedirs(os.path.dirname(self.undelivered_file) or '.', exist_ok=True)
+            tmp_file = self.undelivered_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump({recipient: {'jobs': jobs, 'failures': failures}
+                           for recipient, (jobs, failures) in self.undelivered.items()}, f, indent=4)
+            os.replace(tmp_file, self.undelivered_file)
+            return True
+        except Exception as e:
+            print(f"Error saving undelivered digests: {e}")
+            return False
+
+    def send_message(self, msg):
+        """Send one message, retrying transient failures; returns 'sent', 'refused' or 'failed'."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.pool.connection() as server:
+                    try:
+                        with metrics.timer('smtp_send'):
+                            server.send_message(msg)
+                    except smtplib.SMTPRecipientsRefused as e:
+                        # The connection is still good, so it goes back to the pool
+                        print(f"Recipient {msg['To']} refused: {e.recipients}")
+                        return 'refused'
+                return 'sent'
+            except (smtplib.SMTPResponseException, *TRANSIENT_ERRORS) as e:
+                # 5xx replies (bad credentials, rejected sender) won't get better by retrying
+                if isinstance(e, smtplib.SMTPResponseException) and not 400 <= e.smtp_code < 500:
+                    print(f"Error sending email to {msg['To']}: {e}")
+                    return 'failed'
+                error = e
+            except OSError as e:
+                error = e
+            except Exception as e:
+                print(f"Error sending email to {msg['To']}: {e}")
+                return 'failed'
+            if attempt < self.max_retries:
+                metrics.count('smtp_retries')
+                time.sleep(min(30, 2 ** attempt) + random.uniform(0, 1))
+        print(f"Error sending email to {msg['To']} after {self.max_retries + 1} attempts: {error}")
+        return 'failed'
+
+    def send_digests(self, digests):
+        """Send [(recipient, jobs)] digests concurrently; returns {recipient: 'sent', 'refused' or 'failed'}."""
+        if not digests:
+            return {}
+        messages = [build_digest(self.sender_email, recipient, jobs) for recipient, jobs in digests]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(messages))) as executor:
+            statuses = list(executor.map(self.send_message, messages))
+        for status in statuses:
+            metrics.count('emails', status=status)
+        print(f"Email notifications sent to {statuses.count('sent')} of {len(messages)} recipients")
+        return {recipient: status for (recipient, _), status in zip(digests, statuses)}
+
+    def notify(self, matching_jobs, primary_recipient=None):
+        """Send RECIPIENT_EMAIL's and each contact's digest for matching_jobs; returns whether to flag the jobs as sent.
+
+        Delivery is tracked per recipient. Once any digest has gone out the jobs count as sent, and
+        recipients whose digest failed get those jobs again with the next notify() call, in this run
+        or a later one, instead of the whole batch being resent to everyone. Refused addresses are
+        dropped. When nothing went out, or the digests still owed could not be written, False leaves
+        the jobs for the caller to retry.
+        """
+        recipients = load_recipients(self.recipients_file)
+        matching_jobs = [digest_job(job) for job in matching_jobs]
+        digests = dict(plan_digests(matching_jobs, primary_recipient, recipients))
+        for recipient, (jobs, _) in self.undelivered.items():
+            digests[recipient] = merge_jobs(jobs, digests.get(recipient, []))
+        if not digests:
+            print("No recipients configured for the matches, no email sent")
+            return False
+
+        statuses = self.send_digests(list(digests.items()))
+        delivered = 'sent' in statuses.values()
+        owed_before = dict(self.undelivered)
+        for recipient, status in statuses.items():
+            if status != 'failed':
+                self.undelivered.pop(recipient, None)
+                continue
+            _, failures = self.undelivered.get(recipient, (None, 0))
+            if failures + 1 >= self.max_undelivered_batches:
+                print(f"Giving up on {len(digests[recipient])} matches for {recipient} "
+                      f"after {failures + 1} failed batches")
+                self.undelivered.pop(recipient, None)
+            elif delivered or recipient in self.undelivered:
+                # Queued jobs were already flagged as sent, so they must stay queued even if nothing went out
+                self.undelivered[recipient] = (digests[recipient], failures + 1)
+        if self.undelivered != owed_before and not self.save_undelivered():
+            return False
+        return delivered
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,140 @@
+"""Single-process crawl -> match -> notify.
+
+The crawler's new jobs go straight to the matcher in memory as the searches find them, instead of
+round-tripping through the job store; every batch is matched, emailed and then written once, with
+email flags already set (at the end of the run on the json backend, which rewrites the whole file
+on each save), so the first alert goes out while the crawl is still running:
+
+    python pipeline.py
+"""
+import os
+import time
+
+from linkedin_crawler import LinkedInJobCrawler
+from metrics import metrics, profile_run
+from notifier import Notifier
+from tfidf_matcher import JobMatcher, excel_file_path, notify_matches
+
+
+class CrawlMatchPipeline:
+    def __init__(self, crawler=None, config_file=None):
+        """Wrap a crawler; the matcher is loaded on the first cycle."""
+        self.crawler = crawler if crawler is not None else LinkedInJobCrawler(config_file)
+        self.matcher = None
+        self.employer_mtime = None
+        # Keeps its SMTP connections open from one batch's alerts to the next
+        self.notifier = Notifier.from_env()
+        # Matched jobs whose email failed, retried with the next batch; None until the store's backlog has been read
+        self.retry_records = None
+
+    def refresh_matcher(self):
+        """Load the matcher, reloading it only when uscis.xlsx has changed since the last cycle."""
+        mtime = os.path.getmtime(excel_file_path)
+        if self.matcher is None or mtime != self.employer_mtime:
+            if self.matcher is not None:
+                self.matcher.close()
+                # A new employer list may match jobs the old one didn't, so look at the backlog again
+                self.retry_records = None
+            with metrics.timer('load_employer_index'):
+                self.matcher = JobMatcher.load()
+            self.employer_mtime = mtime
+            print(f"Loaded employer index with {len(self.matcher.employer_index)} employers")
+
+    def match_batch(self, new_jobs, unsaved_jobs=()):
+        """Match new jobs plus any unsent backlog, send one alert, and flag the matches.
+
+        Jobs not yet written (this batch's, plus unsaved_jobs from earlier batches) are only flagged
+        in memory, since they are saved later; backlog jobs already in the store are flagged there.
+        """
+        # The first batch also picks up jobs an earlier process left without an email
+        if self.retry_records is None:
+            backlog = self.crawler.store.pending_jobs()
+            print(f"Found {len(backlog)} stored jobs without an email sent")
+        else:
+            backlog = self.retry_records
+        records = backlog + new_jobs
+        if not records:
+            return
+        matching_jobs, matched_records = self.matcher.match_jobs(records)
+        sent = notify_matches(matching_jobs, self.notifier)
+
+        new_ids = {id(job) for job in new_jobs}
+        new_ids.update(id(job) for job in unsaved_jobs)
+        if sent:
+            for record in matched_records:
+                if id(record) in new_ids:
+                    record['email_sent'] = True
+            backlog_sent = [record for record in matched_records if id(record) not in new_ids]
+            if backlog_sent:
+                with metrics.timer('mark_email_sent'):
+                    self.crawler.store.mark_email_sent(backlog_sent)
+        elif matching_jobs:
+            print("Failed to send email, will retry these matches with the next batch")
+        # Unmatched jobs stay pending in the store but only match again if the employer list changes
+        self.retry_records = [] if sent else matched_records
+
+    def run_cycle(self):
+        """Run one crawl+match cycle, writing its run metrics and optional profile. Returns the new jobs."""
+        metrics.reset()
+        with profile_run(self.crawler.config['metrics'].get('profile'), self.crawler.config['metrics_dir'], 'pipeline'):
+            new_jobs = self.crawl_and_match()
+        self.crawler.write_metrics('pipeline')
+        return new_jobs
+
+    def crawl_and_match(self):
+        """Crawl, matching, emailing and saving new jobs in batches while the crawl runs. Returns the new jobs."""
+        try:
+            self.refresh_matcher()
+        except FileNotFoundError:
+            print(f"Error: Excel file '{excel_file_path}' not found, skipping matching")
+            new_jobs = self.crawler.collect_new_jobs()
+            self.crawler.save_run(new_jobs)
+            return new_jobs
+
+        stream_config = self.crawler.config['stream']
+        batch_size = stream_config.get('match_batch_size')
+        batch_seconds = stream_config.get('match_interval_seconds')
+        # The json store rewrites its whole file on every save, so there batches are only written at the end
+        save_batches = self.crawler.store.incremental_saves
+        new_jobs = []
+        batch = []
+        unsaved_jobs = []
+        batch_started = time.monotonic()
+        for job in self.crawler.iter_new_jobs():
+            new_jobs.append(job)
+            batch.append(job)
+            if (batch_size and len(batch) >= batch_size) or \
+                    (batch_seconds is not None and time.monotonic() - batch_started >= batch_seconds):
+                # Flags are set before the batch is written, so each batch is saved once
+                self.match_batch(batch, unsaved_jobs)
+                if save_batches:
+                    self.crawler.save_jobs(batch)
+                else:
+                    unsaved_jobs.extend(batch)
+                batch = []
+                batch_started = time.monotonic()
+
+        # The rest is saved along with the hourly prune and the crawler's in-memory state
+        self.match_batch(batch, unsaved_jobs)
+        unsaved_jobs.extend(batch)
+        self.crawler.save_run(new_jobs, unsaved_jobs=unsaved_jobs)
+        return new_jobs
+
+    def close(self):
+        if self.matcher is not None:
+            self.matcher.close()
+        self.notifier.close()
+        self.crawler.cleanup()
+
+
+if __name__ == "__main__":
+    try:
+        pipeline = CrawlMatchPipeline()
+        pipeline.run_cycle()
+    except KeyboardInterrupt:
+        print("\nPipeline stopped by user")
+    except Exception as e:
+        print(f"\nError in crawl+match pipeline: {e}")
+    finally:
+        if 'pipeline' in locals():
+            pipeline.close()
@@ -0,0 +1,62 @@
+"""Rate limiting shared by every fetcher that talks to the same host."""
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Space out request starts to each host across all threads."""
+
+    def __init__(self, min_interval_seconds):
+        self.min_interval = min_interval_seconds
+        self.lock = threading.Lock()
+        self.next_allowed = {}
+
+    def wait(self, url):
+        """Block until url's host may be hit again and return how long we waited."""
+        host = urlparse(url).netloc
+        with self.lock:
+            # Reserve the next slot under the lock, then sleep outside it so other hosts are not held up
+            now = time.monotonic()
+            start = max(now, self.next_allowed.get(host, now))
+            self.next_allowed[host] = start + self.min_interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class AsyncTokenBucket:
+    """Token bucket for asyncio tasks: rate requests per second on average, bursts of up to capacity."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for a token; waiters are served in arrival order."""
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """Hold every request for seconds, e.g. after the host answered 429, and drop any saved-up burst."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        self.updated = self.paused_until
@@ -0,0 +1,90 @@
+"""Search specs: expand keyword x location x experience grids from the config into LinkedIn search URLs."""
+from itertools import product
+from urllib.parse import quote, urlencode
+
+
+LINKEDIN_SEARCH_URL = 'https://www.linkedin.com/jobs/search/'
+
+# LinkedIn's f_E experience filter codes
+EXPERIENCE_LEVELS = {
+    'internship': '1',
+    'entry': '2',
+    'associate': '3',
+    'mid-senior': '4',
+    'director': '5',
+    'executive': '6',
+}
+
+
+def as_list(value):
+    """Wrap a single config value in a list; None or an empty list means 'no filter'."""
+    if value is None:
+        return [None]
+    if isinstance(value, (list, tuple)):
+        return list(value) or [None]
+    return [value]
+
+
+def experience_filter(experience):
+    """Turn 'entry', 2, '2,3' or ['entry', 'associate'] into an f_E value like '2,3'."""
+    if experience is None:
+        return None
+    levels = experience if isinstance(experience, (list, tuple)) else str(experience).split(',')
+    return ','.join(EXPERIENCE_LEVELS.get(str(level).strip().lower(), str(level).strip()) for level in levels)
+
+
+def build_search_url(keywords, location=None, experience=None, time_posted='r86400', sort_by=None, start=0):
+    """Build a LinkedIn jobs search URL for one keyword/location/experience combination.
+
+    sort_by='DD' lists the newest postings first.
+    """
+    params = {'keywords': keywords}
+    if location:
+        params['location'] = location
+    f_e = experience_filter(experience)
+    if f_e:
+        params['f_E'] = f_e
+    if time_posted:
+        params['f_TPR'] = time_posted
+    if sort_by:
+        params['sortBy'] = sort_by
+    params['start'] = start
+    return f"{LINKEDIN_SEARCH_URL}?{urlencode(params, quote_via=quote)}"
+
+
+def expand_searches(config):
+    """Return one search dict (name, url and any extra spec keys) per combination in config['searches'].
+
+    Each spec may list several keywords, locations and experience filters; every combination
+    becomes its own search. A spec with a 'url' is used as is. Without any specs the single
+    config['job_url'] is crawled, as before.
+    """
+    specs = config.get('searches') or []
+    if not specs:
+        return [{'name': 'job_url', 'url': config['job_url']}]
+
+    searches = []
+    seen_urls = set()
+    for spec in specs:
+        extra = {key: value for key, value in spec.items()
+                 if key not in ('url', 'keywords', 'locations', 'experience', 'time_posted', 'sort_by')}
+        if spec.get('url'):
+            combinations = [(spec['url'], spec.get('name') or spec['url'])]
+        else:
+            combinations = []
+            for keywords, location, experience in product(as_list(spec.get('keywords')),
+                                                          as_list(spec.get('locations')),
+                                                          as_list(spec.get('experience'))):
+                url = build_search_url(keywords, location, experience, spec.get('time_posted', 'r86400'),
+                                       spec.get('sort_by'))
+                name = ' | '.join(str(part) for part in (keywords, location, experience) if part)
+                combinations.append((url, name))
+
+        for url, name in combinations:
+            # The same combination listed twice would only fetch the same page twice
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            searches.append({**extra, 'name': name, 'url': url})
+
+    return searches
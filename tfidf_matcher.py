@@ -1,178 +1,188 @@
-import pandas as pd
+"""Match crawled jobs to H-1B sponsoring employers and email the matches.
+
+Importable: JobMatcher matches any batch of job records in memory, notify_matches sends the
+alert emails (see notifier.py) and run_matcher processes every job in a store that still needs one. Running the
+module as a script does the latter for the crawler's job store.
+"""
 import json
-from sklearn.feature_extraction.text import TfidfVectorizer
-import numpy as np
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime
-
-# Specify the path to your JSON file
-json_file_path = os.path.join(os.path.dirname(__file__), 'data', 'database.json') 
-
-# Read the JSON file
-try:
-    with open(json_file_path, 'r') as file:
-        json_data = json.load(file)
-except FileNotFoundError:
-    print(f"Error: File '{json_file_path}' not found.")
-    exit()
-except json.JSONDecodeError:
-    print(f"Error: File '{json_file_path}' contains invalid JSON.")
-    exit()
-
-# Check if the JSON data is a list or a single record
-if not isinstance(json_data, list):
-    json_data = [json_data]  # Convert single record to list for consistent processing
-
-# Load the Excel file
-excel_file_path = os.path.join(os.path.dirname(__file__), 'data', 'uscis.xlsx')  # Replace with your actual path
-try:
-    excel_data = pd.read_excel(excel_file_path)
-except FileNotFoundError:
-    print(f"Error: Excel file '{excel_file_path}' not found.")
-    exit()
-
-excel_data.dropna(subset=['Employer (Petitioner) Name'], inplace=True)  # Drop rows with missing company names in Excel data
-
-
-def send_batch_email_notification(matching_jobs, recipient_email):
-    """Send a single email with all matching companies."""
-    try:
-        # Email settings
-        sender_email = os.environ.get("SENDER_EMAIL")  # Replace with your Gmail
-        print(f"Sender email: {sender_email}")  # Debugging line to check sender email
-        sender_password = os.environ.get("SENDER_PASSWORD") 
-        print(sender_password)
-        print(type(sender_password))
-        print(f"Sender password: {'*' * len(sender_password) if sender_password else 'Not Set'}")  # Mask password for security
-        smtp_server = "smtp.gmail.com"
-        smtp_port = 587
-        
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"Job Match Alert: {len(matching_jobs)} H-1B Sponsoring Companies"
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
+from employer_index import DEFAULT_N_PROBE, EmployerIndex
+from match_cache import MatchCache, cached_match_batch
+from job_store import open_job_store
+from metrics import metrics, profile_run, write_run_metrics
+from notifier import Notifier
+
+data_dir = os.path.join(os.path.dirname(__file__), 'data')
+excel_file_path = os.path.join(data_dir, 'uscis.xlsx')  # Replace with your actual path
+employer_cache_dir = os.path.join(data_dir, 'cache')
+metrics_dir = os.path.join(data_dir, 'metrics')
+
+
+def open_matcher_store():
+    """Open the same job store as the crawler (backend selected in carwler.json)."""
+    store_config = {
+        'database_file': os.path.join(data_dir, 'database.json'),
+        'sqlite_file': os.path.join(data_dir, 'jobs.db'),
+        'journal_file': os.path.join(data_dir, 'jobs.jsonl'),
+    }
+    config_file_path = os.path.join(data_dir, 'carwler.json')
+    if os.path.exists(config_file_path):
+        with open(config_file_path, 'r') as file:
+            crawler_config = json.load(file)
+        for key in ('storage_backend', 'journal_compact_bytes'):
+            if key in crawler_config:
+                store_config[key] = crawler_config[key]
+    return open_job_store(store_config)
+
+
+def load_employer_index():
+    """Fit the TF-IDF vectorizer over all employers once; the fitted matrix is cached on disk until the sheet changes."""
+    # MATCH_N_PROBE=0 turns candidate blocking off and scores every employer
+    n_probe = int(os.environ.get("MATCH_N_PROBE", DEFAULT_N_PROBE)) or None
+    return EmployerIndex.load_cached(excel_file_path, employer_cache_dir, threshold=0.6, n_probe=n_probe)
+
+
+def open_match_cache(employer_index):
+    """Open the company -> employer match cache for this version of the employer index."""
+    return MatchCache(
+        os.path.join(employer_cache_dir, 'match_cache.json'),
+        employer_index.match_version,
+        max_entries=int(os.environ.get("MATCH_CACHE_SIZE", 10000)),
+    )
+
+
+class JobMatcher:
+    """Matches job records against the pre-fitted employer index, consulting the match cache first."""
+    
+    def __init__(self, employer_index, match_cache=None, chunk_size=None):
+        self.employer_index = employer_index
+        self.match_cache = match_cache if match_cache is not None else open_match_cache(employer_index)
+        self.chunk_size = chunk_size or int(os.environ.get("MATCH_CHUNK_SIZE", 1024))
         
-        # Create HTML content
-        html = f"""
-        <html>
-          <head></head>
-          <body>
-            <h2>Job Opportunities at H-1B Sponsoring Companies</h2>
-            <p>We found {len(matching_jobs)} jobs at companies known to sponsor H-1B visas:</p>
-            <table border="1" cellpadding="5">
-              <tr>
-                <th>Company</th>
-                <th>Matched Company</th>
-                <th>Job Title</th>
-                <th>Match Score</th>
-                <th>Link</th>
-              </tr>
-        """
+    @classmethod
+    def load(cls):
+        """Load the employer index and match cache from the data directory; raises FileNotFoundError without uscis.xlsx."""
+        return cls(load_employer_index())
         
-        # Add each matching job to the email
-        for job in matching_jobs:
-            html += f"""
-              <tr>
-                <td>{job['company']}</td>
-                <td>{job['matched_company']}</td>
-                <td>{job['title']}</td>
-                <td>{job['match_score']:.2f}</td>
-                <td><a href="{job['url']}">View Job</a></td>
-              </tr>
-            """
+    def match_jobs(self, records):
+        """Return (matching_jobs, matched_records) for the records whose company is a known sponsor."""
+        matching_jobs = []  # To store all matching jobs
+        matched_records = []  # Job records to flag as emailed once the email goes out
+        if not records:
+            return matching_jobs, matched_records
             
-        html += """
-            </table>
-            <p>Date found: {}</p>
-          </body>
-        </html>
-        """.format(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-        
-        # Attach HTML content
-        msg.attach(MIMEText(html, 'html'))
-        
-        # Connect to server and send email
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.send_message(msg)
-        server.quit()
+        # Score all companies against the pre-fitted employer matrix in chunks,
+        # consulting the company -> employer match cache before doing any vector math
+        hits, misses = self.match_cache.hits, self.match_cache.misses
+        with metrics.timer('match'):
+            matches = cached_match_batch(self.employer_index, [record["company"] for record in records],
+                                         self.match_cache, chunk_size=self.chunk_size)
+        metrics.count('match_cache_lookups', self.match_cache.hits - hits, result='hit')
+        metrics.count('match_cache_lookups', self.match_cache.misses - misses, result='miss')
+        metrics.count('jobs_matched', sum(match is not None for match in matches))
+        self.match_cache.save()
+        print(f"Match cache: {self.match_cache.hits} hits, {self.match_cache.misses} misses "
+              f"({self.match_cache.hit_rate:.1%} hit rate)")
+        if self.employer_index.last_batch_stats:
+            stats = self.employer_index.last_batch_stats
+            print(f"Matched {stats['companies']} companies in {stats['seconds']:.2f}s "
+                  f"({stats['companies_per_second']:.1f} companies/second)")
+            if stats['candidates_per_company'] is not None:
+                print(f"Scored {stats['candidates_per_company']:.0f} candidate employers per company "
+                      f"out of {len(self.employer_index)}")
+            
+        for record, match in zip(records, matches):
+            company_name = record["company"]
+            print(f"\nProcessing company: {company_name}")
+            
+            # If there's a match above the threshold, add to our matching jobs list
+            if match is not None:
+                matched_company, match_score = match
+                petitions = self.employer_index.petitions(matched_company)
+                print(f"Found match: {company_name} -> {matched_company} (Score: {match_score:.2f}, {petitions} petitions)")
+                
+                # Add to matching jobs list with all necessary info
+                matching_jobs.append({
+                    'title': record.get('title', 'Unknown Title'),
+                    'company': company_name,
+                    'matched_company': matched_company,
+                    'match_score': match_score,
+                    'petitions': petitions,
+                    'url': record["url"],
+                    'location': record.get('location', 'Unknown Location')
+                })
+                matched_records.append(record)
+                
+        return matching_jobs, matched_records
         
-        print(f"Email notification sent for {len(matching_jobs)} matching jobs")
-        return True
-    except Exception as e:
-        print(f"Error sending email notification: {e}")
-        return False
+    def close(self):
+        self.match_cache.save()
 
-# Modified company matching code
-matching_jobs = []  # To store all matching jobs
 
-for record in json_data:
+def notify_matches(matching_jobs, notifier=None):
+    """Email matching_jobs to RECIPIENT_EMAIL and the sendmail.csv contacts; returns whether to flag them as sent.
 
-    if record["email_sent"]:
-        print(f"Skipping {record['company']} - Email already sent")
-        continue
-        
-    print(record["email_sent"], record["company"])
-    company_name = record["company"]
-    job_url = record["url"]
-    print(f"\nProcessing company: {company_name}")
-    
-    # Create a list of all company names to compare
-    all_companies = [company_name] + excel_data['Employer (Petitioner) Name'].tolist()
-    
-    # Initialize TF-IDF Vectorizer
-    vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 3))
-    
-    # Compute TF-IDF matrix
-    tfidf_matrix = vectorizer.fit_transform(all_companies)
-    
-    # Calculate cosine similarity
-    cosine_similarities = np.dot(tfidf_matrix[0:1], tfidf_matrix[1:].T).toarray()[0]
-    
-    # Add similarity scores to a copy of the dataframe
-    result_df = excel_data.copy()
-    result_df['Similarity_Score'] = cosine_similarities
+    Pass a long-lived notifier to keep its SMTP connections open across batches; otherwise one is
+    opened for this batch. Digests still owed to recipients whose email failed are kept on disk
+    either way, so they go out with a later batch or run.
+    """
+    if not matching_jobs:
+        print("No matching companies found, no email sent")
+        return False
+    recipient_email = os.environ.get("RECIPIENT_EMAIL")  # Replace with recipient's email
+    if notifier is not None:
+        return notifier.notify(matching_jobs, recipient_email)
+    notifier = Notifier.from_env()
+    try:
+        return notifier.notify(matching_jobs, recipient_email)
+    finally:
+        notifier.close()
 
-    # Set a threshold for considering a match
-    threshold = 0.6
-    result_df['Is_Match'] = result_df['Similarity_Score'] >= threshold
+
+def run_matcher(job_store, matcher):
+    """Match every job in the store that still needs an email, send one alert and flag the matched jobs."""
+    # Read the jobs that still need an email
+    pending_records = job_store.pending_jobs()
+    print(f"Found {len(pending_records)} jobs without an email sent")
     
-    # Get matches above threshold
-    matches = result_df[result_df['Is_Match']]
+    matching_jobs, matched_records = matcher.match_jobs(pending_records)
     
-    # If there's at least one match, add to our matching jobs list
-    if len(matches) > 0:
-        best_match = matches.sort_values(by='Similarity_Score', ascending=False).iloc[0]
-        print(f"Found match: {company_name} -> {best_match['Employer (Petitioner) Name']} (Score: {best_match['Similarity_Score']:.2f})")
-        
-        # Add to matching jobs list with all necessary info
-        matching_jobs.append({
-            'title': record.get('title', 'Unknown Title'),
-            'company': company_name,
-            'matched_company': best_match['Employer (Petitioner) Name'],
-            'match_score': best_match['Similarity_Score'],
-            'url': job_url,
-            'location': record.get('location', 'Unknown Location')
-        })
-
-        print(matching_jobs)
-
-        # Mark this record for email sent flag (will be updated later)
-        record["email_sent"] = True
-
-# After processing all jobs, send a single email if we have matches
-if matching_jobs:
-    recipient_email = os.environ.get("RECIPIENT_EMAIL")  # Replace with recipient's email
-    if send_batch_email_notification(matching_jobs, recipient_email):
-        with open(json_file_path, 'w') as file:
-            json.dump(json_data, file, indent=4)
-            print(f"Updated job database with email sent flags")
-    else:
+    # After processing all jobs, send a single email if we have matches
+    if notify_matches(matching_jobs):
+        with metrics.timer('mark_email_sent'):
+            job_store.mark_email_sent(matched_records)
+        print(f"Updated job database with email sent flags")
+    elif matching_jobs:
         print("Failed to send email, not updating email_sent flags")
-else:
-    print("No matching companies found, no email sent")
+    return matching_jobs
+
+
+def main():
+    """Run the matcher over the crawler's job store, reporting errors instead of raising them.
+
+    PROFILE_RUN=cpu|memory|both also dumps a profile of the run next to the run metrics.
+    """
+    metrics.reset()
+    with profile_run(os.environ.get("PROFILE_RUN"), metrics_dir, 'matcher'):
+        try:
+            with metrics.timer('load_employer_index'):
+                matcher = JobMatcher.load()
+        except FileNotFoundError:
+            print(f"Error: Excel file '{excel_file_path}' not found.")
+            return
+            
+        job_store = open_matcher_store()
+        try:
+            run_matcher(job_store, matcher)
+        except json.JSONDecodeError:
+            print(f"Error: File '{job_store.path}' contains invalid JSON.")
+        except Exception as e:
+            print(f"Error reading jobs from '{job_store.path}': {e}")
+        finally:
+            matcher.close()
+            job_store.close()
+    write_run_metrics('matcher', metrics_dir)
+
+
+if __name__ == "__main__":
+    main()